@@ -0,0 +1,60 @@
+import numpy as np
+import soundfile as sf
+
+BLOCK_FRAMES = 24000  # write at most ~1s of audio per call
+
+# === Streaming Audio Assembler ===
+class AudioAssembler:
+    # Writes lead silence, each chunk as it arrives and tail silence straight
+    # into one open file, so memory is bounded by the chunk size rather than
+    # by the length of the narration. Without a path the blocks are kept in
+    # memory instead, for callers that hand the samples straight to an encoder.
+    def __init__(self, output_path, sample_rate, lead_silence=1.0, tail_silence=1.0):
+        self.output_path = output_path
+        self.sample_rate = sample_rate
+        self.lead_silence = lead_silence
+        self.tail_silence = tail_silence
+        self.frames = 0
+        self.file = None
+        self.blocks = []
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    @property
+    def samples(self):
+        return np.concatenate(self.blocks) if self.blocks else np.zeros(0, dtype=np.float32)
+
+    def __enter__(self):
+        if self.output_path is not None:
+            self.file = sf.SoundFile(self.output_path, "w", samplerate=self.sample_rate, channels=1)
+        self.write_silence(self.lead_silence)
+        return self
+
+    def write(self, samples):
+        # Slicing keeps memory-mapped input (e.g. a TTS cache hit) paged in block by block
+        for start in range(0, len(samples), BLOCK_FRAMES):
+            self._emit(np.asarray(samples[start:start + BLOCK_FRAMES], dtype=np.float32))
+        return self.duration
+
+    def write_silence(self, seconds):
+        remaining = int(seconds * self.sample_rate)
+        while remaining > 0:
+            block = min(remaining, BLOCK_FRAMES)
+            self._emit(np.zeros(block, dtype=np.float32))
+            remaining -= block
+
+    def _emit(self, block):
+        if self.file is not None:
+            self.file.write(block)
+        else:
+            self.blocks.append(block)
+        self.frames += len(block)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.write_silence(self.tail_silence)
+        if self.file is not None:
+            self.file.close()
+        return False
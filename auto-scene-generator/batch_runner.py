@@ -0,0 +1,147 @@
+import os
+import re
+import json
+import time
+import asyncio
+import argparse
+from v2 import react_manim_agent, flush_speculative_stats, log
+from llm_client import run_with_client
+from tracing import tracer, span
+
+WORK_FOLDER = "batch_jobs"
+REPORT_FILE = "batch_report.jsonl"
+
+
+# --- Resume Support ---
+def finished_ids(report_path, retry_failed=False):
+    done = set()
+    if not os.path.exists(report_path):
+        return done
+    with open(report_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by an interrupted run
+            if entry.get("status") == "success" or not retry_failed:
+                done.add(entry["id"])
+    return done
+
+
+# --- Prompt Stream ---
+def read_prompts(path, invalid=None):
+    """Yield (line number, id, prompt) one line at a time, so huge files are never loaded whole.
+
+    Lines that aren't a JSON object with a prompt are skipped; their line numbers
+    and reasons are appended to `invalid` when a list is given.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                problem = f"not valid JSON ({e.msg})"
+            else:
+                prompt = (entry.get("prompt") or entry.get("body") or entry.get("title")) if isinstance(entry, dict) else None
+                if isinstance(prompt, str) and prompt.strip():
+                    job_id = str(entry.get("id") or entry.get("request_id") or line_number)
+                    yield line_number, job_id, prompt
+                    continue
+                problem = "no `prompt` string" if isinstance(entry, dict) else f"expected an object, got {type(entry).__name__}"
+
+            log(f"⚠️ {path}:{line_number}: {problem}, skipped")
+            if invalid is not None:
+                invalid.append((line_number, problem))
+
+
+def job_workdir(work_folder, job_id, line_number, taken):
+    # IDs that only differ in characters a path can't hold get the line number appended
+    name = re.sub(r"[^\w.-]", "_", job_id)
+    if name in taken:
+        name = f"{name}_line{line_number}"
+    taken.add(name)
+    return os.path.join(work_folder, name)
+
+
+# --- Batch Run ---
+async def run_batch(requests_path, concurrency=2, report_path=REPORT_FILE, work_folder=WORK_FOLDER, speculative=0, retry_failed=False):
+    done = finished_ids(report_path, retry_failed)
+    queue = asyncio.Queue(maxsize=concurrency)
+    counts = {"success": 0, "failed": 0, "error": 0, "skipped": 0, "invalid": 0, "duplicate": 0}
+    invalid = []
+    seen_ids = set()
+    workdirs = set()
+    started = time.perf_counter()
+
+    with open(report_path, "a", encoding="utf-8") as report:
+
+        async def producer():
+            try:
+                for line_number, job_id, prompt in read_prompts(requests_path, invalid):
+                    if job_id in seen_ids:
+                        # The report and --retry-failed go by ID, so only the first one runs
+                        log(f"⚠️ {requests_path}:{line_number}: duplicate id `{job_id}`, skipped")
+                        counts["duplicate"] += 1
+                        continue
+                    seen_ids.add(job_id)
+                    if job_id in done:
+                        counts["skipped"] += 1
+                        continue
+                    await queue.put((job_id, prompt, job_workdir(work_folder, job_id, line_number, workdirs)))
+            finally:
+                counts["invalid"] = len(invalid)
+                for _ in range(concurrency):
+                    await queue.put(None)
+
+        async def consumer():
+            while (job := await queue.get()) is not None:
+                job_id, prompt, workdir = job
+                job_started = time.perf_counter()
+                try:
+                    with span("job", id=job_id):
+                        result = await react_manim_agent(prompt, speculative=speculative, workdir=workdir)
+                except Exception as e:
+                    # Recorded like any other outcome; the rest of the batch keeps going
+                    result = {"status": "error", "attempts": 0, "timings": {}, "output_path": None, "error": repr(e)}
+
+                entry = {"id": job_id, "prompt": prompt, "workdir": workdir, **result}
+                entry.setdefault("timings", {})["job"] = time.perf_counter() - job_started
+                report.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+                report.flush()  # each finished job survives a crash of the rest
+                counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+                log(f"📦 Job {job_id}: {entry['status']} in {entry['timings']['job']:.1f}s")
+
+        await asyncio.gather(producer(), *(consumer() for _ in range(concurrency)))
+    flush_speculative_stats()
+
+    log(
+        f"📦 Batch done in {time.perf_counter() - started:.1f}s: {counts['success']} succeeded, "
+        f"{counts['failed']} failed, {counts['error']} errored, {counts['skipped']} skipped (already in {report_path}), "
+        f"{counts['duplicate']} duplicate ids, {counts['invalid']} invalid lines"
+    )
+    if invalid:
+        log("⚠️ Invalid lines: " + ", ".join(f"{n} ({problem})" for n, problem in invalid))
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Manim agent headlessly over a JSONL file of prompts.")
+    parser.add_argument("requests", nargs="?", default="requests.jsonl", help="one JSON object per line with `id` and `prompt`")
+    parser.add_argument("--concurrency", type=int, default=2, help="jobs running at once")
+    parser.add_argument("--report", default=REPORT_FILE)
+    parser.add_argument("--workdir", default=WORK_FOLDER, help="each job renders in <workdir>/<id>")
+    parser.add_argument("--speculative", type=int, default=0, metavar="K", help="race K code candidates per job")
+    parser.add_argument("--retry-failed", action="store_true", help="rerun jobs the report lists as failed")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome/Perfetto trace of the batch to PATH")
+    args = parser.parse_args()
+    if args.trace:
+        tracer.enable()
+
+    run_with_client(run_batch(args.requests, args.concurrency, args.report, args.workdir, args.speculative, args.retry_failed))
+    tracer.finish(args.trace)
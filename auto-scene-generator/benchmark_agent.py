@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+import resource
+from ollama import ChatResponse, Message
+
+import llm_client
+import batch_runner
+from llm_cache import llm_cache
+from tracing import tracer, count_processes
+
+# Every other job starts from code with a typo, so the static check and the
+# patch fixer are exercised as well as the happy path
+BROKEN_NAME = "Circl"
+
+SCENE_TEMPLATE = """from manim import *
+
+class {classname}(Scene):
+    def construct(self):
+        title = Text({title!r}, font_size=40)
+        shape = {shape}(color=BLUE)
+        self.play(Write(title))
+        self.play(title.animate.to_edge(UP), Create(shape))
+        self.wait(1)
+"""
+
+
+# --- Scripted Ollama Stand-In ---
+class ScriptedClient:
+    """Answers each agent by the JSON schema it asks for, at a configurable generation speed."""
+
+    tokens_per_second = 0.0
+    job_counter = 0
+
+    async def chat(self, model, messages, format=None, options=None, keep_alive=None, **kwargs):
+        fields = set((format or {}).get("properties", {}))
+        user = messages[-1]["content"]
+
+        if fields == {"prompt"}:
+            content = {"prompt": user}
+        elif fields == {"classname", "code"}:
+            ScriptedClient.job_counter += 1
+            broken = ScriptedClient.job_counter % 2 == 0
+            shape = BROKEN_NAME if broken else "Circle"
+            content = {"classname": "BenchScene", "code": SCENE_TEMPLATE.format(classname="BenchScene", title=user[:40], shape=shape)}
+        elif fields == {"edits"}:
+            content = {"edits": [{"find": f"shape = {BROKEN_NAME}(color=BLUE)", "replace": "shape = Circle(color=BLUE)"}]}
+        elif fields == {"code"}:
+            code = user.split("Code:\n", 1)[-1].split("\n\nError:\n", 1)[0]
+            content = {"code": code.replace(f"{BROKEN_NAME}(", "Circle(")}
+        else:
+            content = {"summary": user[-200:]}
+
+        text = json.dumps(content)
+        tokens = max(1, len(text) // 4)
+        generation = tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+        await asyncio.sleep(generation)
+        return ChatResponse(
+            model=model,
+            message=Message(role="assistant", content=text),
+            eval_count=tokens,
+            eval_duration=int(generation * 1e9),
+            prompt_eval_count=sum(len(m["content"]) for m in messages) // 4,
+        )
+
+
+# --- Benchmark Run ---
+def run(prompts_path, concurrency, tokens_per_second, work_folder):
+    llm_client.AsyncClient = ScriptedClient
+    ScriptedClient.tokens_per_second = tokens_per_second
+    llm_cache.enabled = False
+    tracer.reset()
+    tracer.enable()
+
+    report_path = os.path.join(work_folder, "report.jsonl")
+    os.makedirs(work_folder, exist_ok=True)
+    if os.path.exists(report_path):
+        os.remove(report_path)  # every benchmark run starts from scratch
+
+    started = time.perf_counter()
+    with count_processes() as spawned:
+        counts = llm_client.run_with_client(batch_runner.run_batch(prompts_path, concurrency, report_path, work_folder))
+    wall = time.perf_counter() - started
+
+    scenes = counts["success"]
+    return {
+        "scenes": scenes,
+        "jobs": dict(counts),
+        "wall_seconds": wall,
+        "scenes_per_minute": scenes / wall * 60 if wall else 0.0,
+        "stages": tracer.stage_stats(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_child_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "processes": dict(spawned),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the agent loop with a scripted LLM (see ../benchmark.py).")
+    parser.add_argument("prompts", nargs="?", default="requests.jsonl")
+    parser.add_argument("--output", default="bench_agent.json")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--llm-tps", type=float, default=0.0, help="scripted generation speed in tokens/s (0 = instant)")
+    parser.add_argument("--workdir", default="bench_jobs")
+    args = parser.parse_args()
+
+    result = run(args.prompts, args.concurrency, args.llm_tps, args.workdir)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"📈 agent: {result['scenes']} scenes in {result['wall_seconds']:.1f}s ({result['scenes_per_minute']:.1f}/min)")
@@ -0,0 +1,174 @@
+import os
+import ast
+import json
+import time
+import builtins
+import importlib.util
+from importlib import metadata
+
+# Manim's public names, stored once per installed version so the check stays
+# in the millisecond range instead of paying for `import manim` every time.
+API_CACHE_FILE = os.environ.get("MANIM_API_CACHE", ".manim_api.json")
+
+_api_names = {}
+
+
+def manim_api_names():
+    """Names exported by `from manim import *`, or None when Manim isn't installed."""
+    if importlib.util.find_spec("manim") is None:
+        return None
+    try:
+        version = metadata.version("manim")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    if version in _api_names:
+        return _api_names[version]
+
+    names = None
+    if os.path.exists(API_CACHE_FILE):
+        with open(API_CACHE_FILE, "r") as f:
+            cached = json.load(f)
+        if cached.get("version") == version:
+            names = set(cached["names"])
+
+    if names is None:
+        import manim
+        names = set(getattr(manim, "__all__", None) or (n for n in dir(manim) if not n.startswith("_")))
+        tmp_path = f"{API_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": version, "names": sorted(names)}, f)
+        os.replace(tmp_path, API_CACHE_FILE)
+
+    _api_names[version] = names
+    return names
+
+
+# --- Individual Checks ---
+def _base_names(node):
+    for base in node.bases:
+        if isinstance(base, ast.Name):
+            yield base.id
+        elif isinstance(base, ast.Attribute):
+            yield base.attr
+
+
+def _check_scene_class(tree, classname):
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+    if classname not in classes:
+        found = ", ".join(f"`{name}`" for name in classes) or "none"
+        return [f"Scene class `{classname}` is not defined (classes found: {found}). Define `class {classname}(Scene)`."]
+
+    scene = classes[classname]
+    issues = []
+    # Accept any *Scene base (ThreeDScene, MovingCameraScene, ...) or a local subclass of one
+    bases = set(_base_names(scene))
+    local_scenes = {name for name, node in classes.items() if any(b.endswith("Scene") for b in _base_names(node))}
+    if not any(b.endswith("Scene") or b in local_scenes for b in bases):
+        issues.append(f"Class `{classname}` must subclass Scene (bases: {', '.join(bases) or 'none'}).")
+
+    methods = {node.name for node in scene.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+    if "construct" not in methods:
+        issues.append(f"Class `{classname}` has no `construct(self)` method.")
+    return issues
+
+
+def _check_imports(tree, api):
+    issues = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "manim":
+            for alias in node.names:
+                if alias.name != "*" and alias.name not in api:
+                    issues.append(f"line {node.lineno}: `{alias.name}` is not part of Manim's public API (ImportError).")
+    return issues
+
+
+def _defined_names(tree):
+    names = set(dir(builtins))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+    return names
+
+
+def _check_undefined_names(tree, api):
+    star_modules = {
+        node.module for node in ast.walk(tree)
+        if isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names)
+    }
+    # Only star imports from manim itself can be resolved without importing anything
+    if star_modules - {"manim"}:
+        return []
+
+    defined = _defined_names(tree) | (api if "manim" in star_modules else set())
+    issues, seen = [], set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in defined and node.id not in seen:
+            seen.add(node.id)
+            issues.append(f"line {node.lineno}: name `{node.id}` is not defined (not imported and not a Manim name).")
+    return issues
+
+
+def _exits_loop(loop):
+    # A break that belongs to this loop, or a return/raise anywhere inside it
+    stack = list(loop.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Return, ast.Raise, ast.Break)):
+            return True
+        if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+            stack.extend(n for n in ast.walk(node) if isinstance(n, (ast.Return, ast.Raise)))
+            stack.extend(node.orelse)
+            continue
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+    return False
+
+
+def _check_loops(tree):
+    issues = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.While) and isinstance(node.test, ast.Constant) and node.test.value:
+            if not _exits_loop(node):
+                issues.append(f"line {node.lineno}: `while {node.test.value!r}` loop never breaks or returns; the render would hang.")
+    return issues
+
+
+# --- Full Validation ---
+def validate_scene(code: str, classname: str) -> list[str]:
+    """Return a list of problems found without rendering; an empty list means the code may be rendered."""
+    try:
+        tree = ast.parse(code, filename="main.py")
+    except SyntaxError as e:
+        return [f"SyntaxError: {e.msg} (main.py, line {e.lineno})"]
+
+    issues = _check_scene_class(tree, classname) + _check_loops(tree)
+    api = manim_api_names()
+    if api is not None:
+        issues += _check_imports(tree, api) + _check_undefined_names(tree, api)
+    return issues
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Statically validate a generated Manim scene.")
+    parser.add_argument("classname")
+    parser.add_argument("file", nargs="?", default="main.py")
+    args = parser.parse_args()
+
+    with open(args.file, "r") as f:
+        source = f.read()
+    started = time.perf_counter()
+    problems = validate_scene(source, args.classname)
+    for problem in problems:
+        print(f"❌ {problem}")
+    print(f"{'✅ OK' if not problems else f'{len(problems)} problem(s)'} in {(time.perf_counter() - started) * 1000:.1f} ms")
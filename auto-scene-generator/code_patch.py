@@ -0,0 +1,44 @@
+import ast
+import textwrap
+
+
+class PatchError(Exception):
+    pass
+
+
+def _apply_one(code, find, replace):
+    # A one-line `find` that is a whole line is matched on the stripped line,
+    # so the model's indentation doesn't matter and the code's is kept
+    stripped = find.strip()
+    if stripped and "\n" not in stripped:
+        lines = code.splitlines(keepends=True)
+        matches = [i for i, line in enumerate(lines) if line.strip() == stripped]
+        if len(matches) == 1:
+            line = lines[matches[0]]
+            indent = line[:len(line) - len(line.lstrip())]
+            ending = "\n" if line.endswith("\n") else ""
+            replacement = textwrap.dedent(replace.strip("\n")).splitlines()
+            if not replacement:
+                lines[matches[0]] = ""  # an empty replace deletes the line
+            else:
+                lines[matches[0]] = "\n".join(indent + r if r else r for r in replacement) + ending
+            return "".join(lines)
+
+    if code.count(find) == 1:
+        return code.replace(find, replace, 1)
+    raise PatchError(f"`{stripped[:60]}` matches {code.count(find)} places in the code, expected exactly 1")
+
+
+def apply_edits(code: str, edits) -> str:
+    """Apply find/replace edits in order; each `find` must match exactly one place."""
+    if not edits:
+        raise PatchError("patch contains no edits")
+
+    for edit in edits:
+        code = _apply_one(code, edit.find, edit.replace)
+
+    try:
+        ast.parse(code)
+    except SyntaxError as e:
+        raise PatchError(f"patched code does not parse: {e.msg} (line {e.lineno})")
+    return code
@@ -0,0 +1,122 @@
+import re
+import difflib
+from code_check import manim_api_names
+
+# How often the rules below were enough, and how often the LLM had to step in
+parser_stats = {"parsed": 0, "fallback": 0}
+
+CONTEXT_LINES = 2
+
+# `File "/x/main.py", line 7, in construct` (plain) or `/x/main.py:7 in construct` (rich)
+FRAME_PATTERNS = [
+    re.compile(r'File "(?:[^"]*[\\/])?main\.py", line (\d+)'),
+    re.compile(r'(?:\S*[\\/])?main\.py:(\d+) in'),
+]
+EXCEPTION_LINE = re.compile(r"^[\s│]*((?:\w+\.)*\w*(?:Error|Exception|Exit|Interrupt)):\s*(.*?)[\s│]*$")
+LATEX_MARKERS = ("latex error converting", "LaTeX compilation error")
+
+
+# --- Pieces Of A Traceback ---
+def _strip_ansi(text):
+    return re.sub(r"\x1b\[[0-9;]*m", "", text)
+
+
+def _failing_line(text):
+    line_number = None
+    for pattern in FRAME_PATTERNS:
+        for match in pattern.finditer(text):
+            line_number = int(match.group(1))  # the innermost frame in main.py is the last one
+    return line_number
+
+
+def _exception(text):
+    for line in reversed(text.splitlines()):
+        match = EXCEPTION_LINE.match(line)
+        if match:
+            return match.group(1), match.group(2)
+    return None, None
+
+
+def _snippet(code, line_number):
+    lines = code.splitlines()
+    if not 1 <= line_number <= len(lines):
+        return ""
+    start = max(1, line_number - CONTEXT_LINES)
+    end = min(len(lines), line_number + CONTEXT_LINES)
+    return "\n".join(
+        f"{'->' if n == line_number else '  '} {n:4d} | {lines[n - 1]}" for n in range(start, end + 1)
+    )
+
+
+def _suggest(name):
+    api = manim_api_names()
+    if not api:
+        return ""
+    close = difflib.get_close_matches(name, api, n=3)
+    return f" Did you mean {', '.join(f'`{c}`' for c in close)}?" if close else ""
+
+
+# --- Known Manim Failure Classes ---
+def _hint(exc_type, message):
+    match = re.search(r"name '(\w+)' is not defined", message)
+    if exc_type == "NameError" and match:
+        return f"`{match.group(1)}` is not a Manim mobject, animation or defined name.{_suggest(match.group(1))}"
+
+    match = re.search(r"cannot import name '(\w+)' from '(manim[\w.]*)'", message)
+    if exc_type == "ImportError" and match:
+        return f"`{match.group(1)}` does not exist in {match.group(2)}.{_suggest(match.group(1))}"
+
+    match = re.search(r"unexpected keyword argument '(\w+)'", message)
+    if exc_type == "TypeError" and match:
+        return f"Remove or rename the unsupported keyword argument `{match.group(1)}`."
+
+    match = re.search(r"'(\w+)' object has no attribute '(\w+)'", message)
+    if exc_type == "AttributeError" and match:
+        return f"`{match.group(1)}` has no method or attribute `{match.group(2)}`."
+
+    if exc_type == "TypeError" and "required positional argument" in message:
+        return "A constructor or method was called with too few arguments."
+    if exc_type in ("SyntaxError", "IndentationError"):
+        return "The code does not parse; fix the syntax on the marked line."
+    if exc_type == "TimeoutError":
+        return "The render never finished; look for unbounded loops or very long animations."
+    return ""
+
+
+def _latex_error(text):
+    # TeX reports problems as lines starting with "! ", followed by the offending input
+    tex_lines = [line.strip().rstrip(".") for line in text.splitlines() if line.lstrip().startswith("! ")]
+    detail = "; ".join(dict.fromkeys(tex_lines)) or "see the LaTeX log"
+    return f"LaTeX compile error in a Tex/MathTex string: {detail}. Check escaping (use raw strings) and unsupported commands."
+
+
+# --- Full Extraction ---
+def extract_error(stderr: str, code: str | None = None) -> str | None:
+    """Summarize a Manim traceback locally, or return None when it can't be classified."""
+    text = _strip_ansi(stderr)
+    exc_type, message = _exception(text)
+
+    if any(marker in text for marker in LATEX_MARKERS):
+        summary = _latex_error(text)
+    elif exc_type is not None:
+        summary = f"{exc_type}: {message}"
+        hint = _hint(exc_type.rsplit(".", 1)[-1], message)
+        if hint:
+            summary += f"\n{hint}"
+    else:
+        parser_stats["fallback"] += 1
+        return None
+
+    line_number = _failing_line(text)
+    if line_number is not None:
+        snippet = _snippet(code, line_number) if code else ""
+        summary += f"\nFailing line {line_number} of main.py" + (f":\n{snippet}" if snippet else ".")
+
+    parser_stats["parsed"] += 1
+    return summary
+
+
+def hit_rate():
+    total = parser_stats["parsed"] + parser_stats["fallback"]
+    rate = parser_stats["parsed"] / total if total else 0.0
+    return f"Local error parser: {parser_stats['parsed']}/{total} handled ({rate:.0%}), {parser_stats['fallback']} sent to the LLM"
@@ -1,6 +1,4 @@
-import asyncio
-
-from ollama import AsyncClient
+from llm_client import llm_chat, run_with_client
 
 
 async def main(user_input, model_name):
@@ -15,8 +13,7 @@ async def main(user_input, model_name):
     },
   ]
 
-  client = AsyncClient()
-  response = await client.chat(model_name, messages=messages)
+  response = await llm_chat(model_name, messages=messages)
   print(response['message']['content'])
 
 
@@ -26,4 +23,4 @@ if __name__ == '__main__':
     # model_name = "marco-o1:latest"
     
     user_input = input("Enter Your Query:")
-    asyncio.run(main(user_input, model_name))
\ No newline at end of file
+    run_with_client(main(user_input, model_name))
\ No newline at end of file
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import hashlib
+from ollama import chat, ChatResponse
+
+CACHE_FOLDER = os.environ.get("LLM_CACHE_DIR", ".llm_cache")
+DEFAULT_TTL = 7 * 24 * 3600  # 1 week
+MAX_CACHE_BYTES = 256 * 1024 ** 2  # 256 MB
+# Eviction walks the whole cache, so it runs every this many writes, not on each one
+EVICT_EVERY = 64
+
+# Non-zero temperatures are sampled, so replaying one answer changes
+# behaviour; those calls only hit the cache when explicitly opted in.
+CACHE_ALL_TEMPERATURES = os.environ.get("LLM_CACHE_ALL", "") == "1"
+
+
+def _normalize(message):
+    # Whitespace only: case can be part of what the scene must show ('NaN' vs 'nan')
+    content = " ".join((message.get("content") or "").split())
+    return {"role": message.get("role"), "content": content}
+
+
+# --- Disk-Backed Response Cache ---
+class LLMCache:
+    def __init__(self, cache_dir=CACHE_FOLDER, ttl=DEFAULT_TTL, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def key(self, model, messages, format=None, options=None):
+        payload = json.dumps({
+            "model": model,
+            "messages": [_normalize(m) for m in messages],
+            "format": format,
+            "options": options or {},
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["created"] > self.ttl:
+                os.remove(path)
+                self.misses += 1
+                return None
+            os.utime(path)  # mtime is the LRU clock
+        except FileNotFoundError:
+            # Evicted by another process between the check and the read
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return ChatResponse.model_validate_json(entry["response"])
+
+    def put(self, key, response):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "response": response.model_dump_json()}, f)
+        os.replace(tmp_path, path)
+        self.writes += 1
+
+    def eviction_due(self):
+        # Callers run evict() when this says so: inline from sync code, in a thread from async code
+        return self.writes % EVICT_EVERY == 0 and self.writes > 0
+
+    def evict(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue  # evicted by another process since the walk listed it
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            total -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+llm_cache = LLMCache()
+
+
+def cacheable(options=None, cache_nonzero_temperature=False):
+    temperature = (options or {}).get("temperature")
+    return llm_cache.enabled and (temperature == 0 or cache_nonzero_temperature or CACHE_ALL_TEMPERATURES)
+
+
+# --- Drop-In Replacement For ollama.chat ---
+def cached_chat(model, messages, format=None, options=None, cache_nonzero_temperature=False, **kwargs):
+    if not cacheable(options, cache_nonzero_temperature):
+        return chat(model=model, messages=messages, format=format, options=options, **kwargs)
+
+    key = llm_cache.key(model, messages, format, options)
+    response = llm_cache.get(key)
+    if response is not None:
+        return response
+
+    response = chat(model=model, messages=messages, format=format, options=options, **kwargs)
+    llm_cache.put(key, response)
+    if llm_cache.eviction_due():
+        llm_cache.evict()
+    return response
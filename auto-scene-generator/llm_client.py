@@ -0,0 +1,141 @@
+import os
+import time
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from ollama import AsyncClient
+from llm_cache import llm_cache, cacheable
+from tracing import span
+
+# Keep models resident between REPL turns instead of Ollama's 5 minute default
+KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+MAX_CONCURRENT_PER_MODEL = int(os.environ.get("OLLAMA_MAX_CONCURRENT", "2"))
+
+# One entry per call: model, latency, tokens generated, tokens/sec, cache hit
+call_stats = []
+# The same entries for the job running in this context only (see collect_calls),
+# so concurrent jobs each get their own figures
+_job_calls = contextvars.ContextVar("job_calls", default=None)
+
+# Connections and semaphores belong to an event loop, so they are rebuilt
+# when a new loop (e.g. another asyncio.run) starts using the client; run
+# through run_with_client() so each loop's connections are closed with it.
+_state = {}
+
+
+def _loop_state():
+    loop = asyncio.get_running_loop()
+    if _state.get("loop") is not loop:
+        _state.clear()
+        _state.update(loop=loop, client=AsyncClient(), limits={})
+    return _state
+
+
+def get_client() -> AsyncClient:
+    return _loop_state()["client"]
+
+
+async def close_client():
+    if _state.get("loop") is not asyncio.get_running_loop():
+        return
+    client = _state["client"]
+    _state.clear()
+    # ollama.AsyncClient keeps its httpx.AsyncClient (and connection pool) in _client
+    http = getattr(client, "_client", None)
+    if http is not None:
+        await http.aclose()
+
+
+def run_with_client(main):
+    """asyncio.run(main) that closes the loop's Ollama client before the loop goes away."""
+    async def closing():
+        try:
+            return await main
+        finally:
+            await close_client()
+    return asyncio.run(closing())
+
+
+def _limit(model):
+    limits = _loop_state()["limits"]
+    if model not in limits:
+        limits[model] = asyncio.Semaphore(MAX_CONCURRENT_PER_MODEL)
+    return limits[model]
+
+
+def _record(model, started, response, cached, llm_span):
+    latency = time.perf_counter() - started
+    tokens = response.eval_count or 0
+    eval_seconds = (response.eval_duration or 0) / 1e9
+    stats = {
+        "model": model,
+        "latency": latency,
+        "prompt_tokens": response.prompt_eval_count or 0,
+        "tokens": tokens,
+        "tokens_per_second": tokens / eval_seconds if eval_seconds else 0.0,
+        "cached": cached,
+    }
+    call_stats.append(stats)
+    job_calls = _job_calls.get()
+    if job_calls is not None:
+        job_calls.append(stats)
+    llm_span.set(**stats)
+
+
+@contextmanager
+def collect_calls():
+    calls = []
+    token = _job_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _job_calls.reset(token)
+
+
+# --- Shared Async Chat ---
+async def llm_chat(model, messages, format=None, options=None, cache_nonzero_temperature=False, **kwargs):
+    with span("llm", model=model) as llm_span:
+        started = time.perf_counter()
+        use_cache = cacheable(options, cache_nonzero_temperature)
+
+        if use_cache:
+            key = llm_cache.key(model, messages, format, options)
+            response = llm_cache.get(key)
+            if response is not None:
+                _record(model, started, response, True, llm_span)
+                return response
+
+        async with _limit(model):
+            response = await get_client().chat(
+                model=model,
+                messages=messages,
+                format=format,
+                options=options,
+                keep_alive=KEEP_ALIVE,
+                **kwargs,
+            )
+        _record(model, started, response, False, llm_span)
+
+        if use_cache:
+            llm_cache.put(key, response)
+            if llm_cache.eviction_due():
+                # A full walk of the cache; kept off the loop the other agents share
+                await asyncio.to_thread(llm_cache.evict)
+        return response
+
+
+def summarize_calls(stats=None):
+    if stats is None:
+        stats = call_stats if _job_calls.get() is None else _job_calls.get()
+    if not stats:
+        return "LLM calls: none"
+
+    live = [s for s in stats if not s["cached"]]
+    latency = sum(s["latency"] for s in stats)
+    tokens = sum(s["tokens"] for s in live)
+    rates = [s["tokens_per_second"] for s in live if s["tokens_per_second"]]
+    return (
+        f"LLM calls: {len(stats)} ({len(stats) - len(live)} cached) | "
+        f"total latency {latency:.2f}s | {tokens} tokens generated | "
+        f"avg {sum(rates) / len(rates) if rates else 0.0:.1f} tok/s"
+    )
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import itertools
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+from datetime import datetime, timezone
+from llm_cache import llm_cache
+
+# Point the agents at the stand-in with OLLAMA_HOST=http://127.0.0.1:11435
+DEFAULT_PORT = 11435
+CASSETTE_FILE = "ollama_cassette.jsonl"
+UPSTREAM = os.environ.get("OLLAMA_UPSTREAM", "http://127.0.0.1:11434")
+
+REASONS = {status.value: status.phrase for status in HTTPStatus}
+
+
+# --- Cassette Of Recorded Exchanges ---
+class Cassette:
+    def __init__(self, path=CASSETTE_FILE):
+        self.path = path
+        self.exact = {}
+        self.by_format = {}  # (model, schema) -> cycle of responses, for prompts never recorded
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+        self._cycles = {k: itertools.cycle(v) for k, v in self.by_format.items()}
+
+    @staticmethod
+    def key(request):
+        # Same normalization as the response cache, so cosmetic prompt differences still hit
+        return llm_cache.key(request.get("model"), request.get("messages", []), request.get("format"), request.get("options"))
+
+    @staticmethod
+    def format_key(request):
+        return request.get("model"), json.dumps(request.get("format"), sort_keys=True)
+
+    def _index(self, exchange):
+        self.exact[self.key(exchange["request"])] = exchange["response"]
+        self.by_format.setdefault(self.format_key(exchange["request"]), []).append(exchange["response"])
+
+    def lookup(self, request):
+        response = self.exact.get(self.key(request))
+        if response is not None:
+            return response, "exact"
+        cycle = self._cycles.get(self.format_key(request))
+        if cycle is not None:
+            return next(cycle), "format"
+        return None, "miss"
+
+    def record(self, request, response):
+        exchange = {"request": request, "response": response}
+        self._index(exchange)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(exchange, ensure_ascii=False) + "\n")
+
+
+# --- Stand-In Server ---
+class StandIn:
+    def __init__(self, mode, cassette, latency=0.0, jitter=0.0, tokens_per_second=0.0,
+                 fail_rate=0.0, malformed_rate=0.0, seed=0, upstream=UPSTREAM):
+        self.mode = mode
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.fail_rate = fail_rate
+        self.malformed_rate = malformed_rate
+        self.random = random.Random(seed)
+        self.upstream = upstream.rstrip("/")
+        self.stats = {"requests": 0, "exact": 0, "format": 0, "miss": 0, "failed": 0, "malformed": 0, "recorded": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    # HTTP/1.1 with keep-alive, which is what the ollama client (httpx) speaks
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+
+                status, payload, content_type = await self.route(method, path.split("?", 1)[0], body)
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+                    f"Content-Type: {content_type}\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if path == "/" and method in ("GET", "HEAD"):
+            return 200, b"Ollama is running", "text/plain"
+        if path == "/api/version":
+            return 200, {"version": "0.0.0-standin"}, "application/json"
+        if path == "/api/tags":
+            models = sorted({model for model, _ in self.cassette.by_format})
+            return 200, {"models": [{"name": m, "model": m} for m in models]}, "application/json"
+        if path == "/standin/stats":
+            return 200, self.stats, "application/json"
+        if path == "/api/chat" and method == "POST":
+            return await self.chat(json.loads(body or b"{}"))
+        return 404, {"error": f"{method} {path} not supported by the stand-in"}, "application/json"
+
+    async def chat(self, request):
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+        try:
+            if self.mode == "record":
+                try:
+                    response = await asyncio.to_thread(self.forward, request)
+                except urllib.error.HTTPError as error:
+                    # Upstream's own error answer, passed through and never recorded
+                    self.stats["failed"] += 1
+                    return error.code, error.read(), error.headers.get("Content-Type", "application/json")
+                except OSError as error:
+                    # URLError included: upstream down, refused or timed out
+                    self.stats["failed"] += 1
+                    return 502, {"error": f"upstream {self.upstream} unreachable: {getattr(error, 'reason', error)}"}, "application/json"
+                self.cassette.record(request, response)
+                self.stats["recorded"] += 1
+            else:
+                response, match = self.cassette.lookup(request)
+                self.stats[match] += 1
+                if response is None:
+                    return 404, {"error": f"no recorded exchange for model '{request.get('model')}' with this format"}, "application/json"
+                response = await self.replay(response)
+                if response is None:
+                    return 500, {"error": "injected failure"}, "application/json"
+
+            if request.get("stream", True):
+                return 200, self.as_stream(response), "application/x-ndjson"
+            return 200, response, "application/json"
+        finally:
+            self.stats["in_flight"] -= 1
+
+    def forward(self, request):
+        # Recorded as a single non-streamed answer; replay re-streams it if asked
+        upstream_request = urllib.request.Request(
+            f"{self.upstream}/api/chat",
+            data=json.dumps({**request, "stream": False}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(upstream_request) as upstream_response:
+            return json.loads(upstream_response.read())
+
+    async def replay(self, response):
+        tokens = response.get("eval_count") or max(1, len(response["message"]["content"]) // 4)
+        generation = tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+        delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)) + generation
+        await asyncio.sleep(delay)
+
+        if self.random.random() < self.fail_rate:
+            self.stats["failed"] += 1
+            return None
+
+        response = {
+            **response,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "total_duration": int(delay * 1e9),
+            "eval_count": tokens,
+            "eval_duration": int(generation * 1e9),
+        }
+        if self.random.random() < self.malformed_rate:
+            # Cut the structured answer short so model_validate_json rejects it
+            self.stats["malformed"] += 1
+            content = response["message"]["content"]
+            response["message"] = {**response["message"], "content": content[:max(1, len(content) // 2)]}
+        return response
+
+    @staticmethod
+    def as_stream(response):
+        chunk = {**response, "done": False}
+        for field in ("done_reason", "total_duration", "load_duration", "prompt_eval_count",
+                      "prompt_eval_duration", "eval_count", "eval_duration"):
+            chunk.pop(field, None)
+        final = {**response, "message": {**response["message"], "content": ""}, "done": True}
+        return (json.dumps(chunk) + "\n" + json.dumps(final) + "\n").encode()
+
+
+async def serve(standin, host="127.0.0.1", port=DEFAULT_PORT):
+    server = await asyncio.start_server(standin.handle_connection, host, port, backlog=4096, limit=2 ** 24)
+    print(f"🎭 Ollama stand-in ({standin.mode}) on http://{host}:{port}, {len(standin.cassette.exact)} recorded exchanges")
+    started = time.perf_counter()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        elapsed = time.perf_counter() - started
+        print(f"🎭 Served {standin.stats['requests']} chats in {elapsed:.1f}s: {json.dumps(standin.stats)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ollama-compatible record/replay server for load-testing the agents.")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--cassette", default=CASSETTE_FILE)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--upstream", default=UPSTREAM, help="real Ollama server used in record mode")
+    parser.add_argument("--latency", type=float, default=0.0, help="base seconds before each replayed answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="simulated generation speed (0 = instant)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of chats answered with HTTP 500")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="fraction of chats whose JSON content is truncated")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    standin = StandIn(
+        args.mode, Cassette(args.cassette), args.latency, args.jitter, args.tokens_per_second,
+        args.fail_rate, args.malformed_rate, args.seed, args.upstream,
+    )
+    try:
+        asyncio.run(serve(standin, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
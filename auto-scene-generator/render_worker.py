@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import types
+import asyncio
+import socket
+import argparse
+import threading
+import traceback
+import socketserver
+import multiprocessing
+from multiprocessing.connection import wait
+
+SOCKET_PATH = os.environ.get("MANIM_RENDER_SOCKET", ".render_worker.sock")
+DEFAULT_TIMEOUT = 300
+
+# Forked per job: the child inherits the already-imported Manim, and a job
+# that crashes, hangs or calls sys.exit() only takes its own process down.
+_fork = multiprocessing.get_context("fork")
+
+
+# --- Job Execution (inside the forked child) ---
+def _render_in_child(job, conn):
+    from manim import Scene, tempconfig
+    from manim.constants import QUALITIES
+
+    started = time.perf_counter()
+    timings = {}
+    result = {"returncode": 1, "traceback": "", "output_path": None}
+    try:
+        workdir = job.get("workdir") or "."
+        os.makedirs(workdir, exist_ok=True)
+        os.chdir(workdir)
+
+        # Written to disk so tracebacks point at main.py like a normal `manim` run
+        with open("main.py", "w") as f:
+            f.write(job["code"])
+
+        module = types.ModuleType("main")
+        module.__file__ = os.path.abspath("main.py")
+        sys.modules["main"] = module
+        exec(compile(job["code"], module.__file__, "exec"), module.__dict__)
+        timings["exec"] = time.perf_counter() - started
+
+        scene_class = getattr(module, job["classname"], None)
+        if not (isinstance(scene_class, type) and issubclass(scene_class, Scene)):
+            raise NameError(f"Scene class `{job['classname']}` not found in main.py")
+
+        quality = next(q for q in QUALITIES.values() if q["flag"] == job.get("quality", "l"))
+        options = {
+            "input_file": "main.py",
+            "media_dir": "media",
+            "pixel_width": quality["pixel_width"],
+            "pixel_height": quality["pixel_height"],
+            "frame_rate": quality["frame_rate"],
+            "preview": False,
+        }
+        options.update(job.get("config", {}))
+
+        render_started = time.perf_counter()
+        with tempconfig(options):
+            scene = scene_class()
+            scene.render()
+            file_writer = scene.renderer.file_writer
+            output_path = getattr(file_writer, "movie_file_path", None) or getattr(file_writer, "image_file_path", None)
+        timings["render"] = time.perf_counter() - render_started
+
+        result["returncode"] = 0
+        result["output_path"] = os.path.abspath(output_path) if output_path else None
+    except BaseException:
+        result["traceback"] = traceback.format_exc()
+
+    timings["child_total"] = time.perf_counter() - started
+    result["timings"] = timings
+    conn.send(result)
+    conn.close()
+
+
+def peer_closed(sock):
+    # The client sends one line and then only waits, so a readable socket means it hung up
+    try:
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+    except BlockingIOError:
+        return False
+    except OSError:
+        return True
+
+
+def run_job(job, peer=None):
+    """Render `job` in a forked child; it is killed on timeout or as soon as `peer` (the client's socket) hangs up."""
+    started = time.perf_counter()
+    receiver, sender = _fork.Pipe(duplex=False)
+    process = _fork.Process(target=_render_in_child, args=(job, sender))
+    process.start()
+    sender.close()
+
+    timeout = job.get("timeout", DEFAULT_TIMEOUT)
+    deadline = time.monotonic() + timeout
+    watched = [receiver] if peer is None else [receiver, peer]
+    try:
+        while True:
+            ready = wait(watched, max(0.0, deadline - time.monotonic()))
+            if receiver in ready:
+                result = receiver.recv()
+                break
+            if not ready:
+                process.kill()
+                result = {"returncode": -9, "traceback": f"TimeoutError: render exceeded {timeout}s", "output_path": None, "timings": {}}
+                break
+            if peer_closed(peer):
+                # e.g. a losing speculative candidate: free the slot for the jobs still wanted
+                process.kill()
+                result = {"returncode": -9, "traceback": "Cancelled: the client disconnected", "output_path": None, "timings": {}}
+                break
+            watched = [receiver]  # stray bytes from the client; stop watching it
+    except EOFError:
+        result = {"returncode": -1, "traceback": "Render process died without a result", "output_path": None, "timings": {}}
+    process.join()
+
+    if result["returncode"] == 0 and process.exitcode not in (0, None):
+        result["returncode"] = process.exitcode
+    result["timings"]["total"] = time.perf_counter() - started
+    return result
+
+
+# --- Socket Server ---
+class RenderHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        job = json.loads(self.rfile.readline())
+        with self.server.slots:
+            if peer_closed(self.connection):
+                print(f"🚫 `{job.get('classname')}` cancelled while queued")
+                return
+            print(f"🎬 Rendering `{job.get('classname')}` at -q{job.get('quality', 'l')} in {job.get('workdir') or '.'}")
+            result = run_job(job, self.connection)
+        status = "✅" if result["returncode"] == 0 else "❌"
+        print(f"{status} `{job.get('classname')}` done in {result['timings']['total']:.2f}s")
+        try:
+            self.wfile.write((json.dumps(result) + "\n").encode())
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # cancelled by the client
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path=SOCKET_PATH, jobs=1):
+    started = time.perf_counter()
+    import manim  # noqa: F401  (imported once here, inherited by every job)
+    print(f"🔥 Manim imported in {time.perf_counter() - started:.2f}s")
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with RenderServer(socket_path, RenderHandler) as server:
+        server.slots = threading.BoundedSemaphore(jobs)
+        print(f"🚀 Render worker listening on {socket_path} ({jobs} concurrent jobs)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Render worker stopped.")
+        finally:
+            os.remove(socket_path)
+
+
+# --- Client ---
+def worker_available(socket_path=SOCKET_PATH):
+    # Only a hint: a killed worker leaves its socket file, so callers still
+    # fall back to a subprocess render when the connection is refused
+    return os.path.exists(socket_path)
+
+
+async def submit_render(code, classname, quality="l", workdir=".", config=None, timeout=DEFAULT_TIMEOUT, socket_path=SOCKET_PATH):
+    job = {
+        "code": code,
+        "classname": classname,
+        "quality": quality,
+        "workdir": os.path.abspath(workdir),
+        "config": config or {},
+        "timeout": timeout,
+    }
+    reader, writer = await asyncio.open_unix_connection(socket_path, limit=2 ** 24)
+    try:
+        writer.write((json.dumps(job) + "\n").encode())
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Long-lived Manim render worker for the scene agents.")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--jobs", type=int, default=1, help="renders allowed to run at once")
+    args = parser.parse_args()
+    serve(args.socket, args.jobs)
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 import subprocess
 
-from ollama import chat
+from llm_cache import cached_chat
 
 
 # Define the schema for the response
@@ -24,7 +24,7 @@ class PromptInfo(BaseModel):
 
 
 def manim_prompt_generator_agent(user_input):
-  response = chat(
+  response = cached_chat(
     model='llama3.1:8b',
     messages=[
               {'role': 'system', 
@@ -44,7 +44,7 @@ def manim_prompt_generator_agent(user_input):
 
 
 def main_agent(user_input):
-  response = chat(
+  response = cached_chat(
     model='llama3.1:8b',
     messages=[
               {'role': 'system', 
@@ -1,6 +1,6 @@
 import asyncio
 from pydantic import BaseModel
-from ollama import chat
+from llm_client import llm_chat, run_with_client
 import aiofiles
 import asyncio.subprocess
 
@@ -18,8 +18,7 @@ class PromptJson(BaseModel):
 
 # Async function to enrich user prompt using Ollama
 async def manim_prompt_generator_agent(user_input: str) -> str:
-    response = await asyncio.to_thread(
-        chat,
+    response = await llm_chat(
         model='llama3.1:8b',
         messages=[
             {
@@ -41,8 +40,7 @@ async def manim_prompt_generator_agent(user_input: str) -> str:
 
 # Async function to generate Manim code using enriched prompt
 async def main_agent(prompt: str) -> SceneJson:
-    response = await asyncio.to_thread(
-        chat,
+    response = await llm_chat(
         model='llama3.1:8b',
         messages=[
             {
@@ -98,6 +96,6 @@ if __name__ == "__main__":
             if user_input.lower() == "exit":
                 print("👋 Goodbye!")
                 break
-            asyncio.run(main(user_input))
+            run_with_client(main(user_input))
     except KeyboardInterrupt:
         print("\n👋 Interrupted. Exiting.")
@@ -1,8 +1,10 @@
 import asyncio
 from pydantic import BaseModel
-from ollama import chat
+from llm_client import llm_chat, run_with_client
 import aiofiles
 import asyncio.subprocess
+from render_worker import worker_available, submit_render
+from code_check import validate_scene
 
 
 class SceneJson(BaseModel):
@@ -16,8 +18,7 @@ class PromptJson(BaseModel):
 
 # Generate enriched prompt
 async def generate_prompt(user_input: str) -> str:
-    response = await asyncio.to_thread(
-        chat,
+    response = await llm_chat(
         model='llama3.1:8b',
         messages=[
             {
@@ -38,8 +39,7 @@ async def generate_prompt(user_input: str) -> str:
 
 # Generate Manim scene code
 async def generate_code(prompt: str) -> SceneJson:
-    response = await asyncio.to_thread(
-        chat,
+    response = await llm_chat(
         model='llama3.1:8b',
         messages=[
             {
@@ -66,7 +66,21 @@ async def save_code_to_file(code: str):
 
 
 # Run Manim
-async def run_manim(classname: str):
+async def run_manim(classname: str, code: str | None = None):
+    if code is not None and worker_available():
+        # A warm worker (`python render_worker.py`) skips uv + interpreter + Manim import
+        print("Action: Submitting render to the render worker...")
+        try:
+            result = await submit_render(code, classname)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Socket left behind by a worker that crashed or was killed
+            print("Observation: Render worker is not responding, rendering with uv run manim instead.")
+        else:
+            print(f"Observation: Render worker finished in {result['timings']['total']:.2f}s.")
+            if result["returncode"] == 0:
+                return f"File ready at {result['output_path']}", ""
+            return "", result["traceback"] or f"Render failed with exit code {result['returncode']}"
+
     print("Action: Running Manim render...")
     process = await asyncio.create_subprocess_exec(
         "uv", "run", "manim", "-pql", "main.py", classname,
@@ -95,8 +109,14 @@ async def react_manim_agent(user_input: str):
         await save_code_to_file(scene.code)
         print("Observation: Code written to main.py")
 
-        stdout, stderr = await run_manim(scene.classname)
-        print("Observation: Manim process completed.")
+        issues = validate_scene(scene.code, scene.classname)
+        if issues:
+            # Caught statically, so no render is spent on it
+            print("Observation: Static check failed, skipping render.")
+            stdout, stderr = "", "\n".join(issues)
+        else:
+            stdout, stderr = await run_manim(scene.classname, scene.code)
+            print("Observation: Manim process completed.")
 
         if stderr.strip() == "":
             print("✅ Final Result: Manim rendered successfully!\n")
@@ -119,7 +139,7 @@ if __name__ == "__main__":
             user_input = input("🎨 Enter scene to generate (or type 'exit'): ").strip()
             if user_input.lower() == "exit":
                 break
-            asyncio.run(react_manim_agent(user_input))
+            run_with_client(react_manim_agent(user_input))
     except KeyboardInterrupt:
         print("\n👋 Exiting.")
 
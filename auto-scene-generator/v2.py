@@ -1,10 +1,31 @@
+import os
+import json
+import time
 import asyncio
+import argparse
+import glob
+import contextvars
+from contextlib import contextmanager
 from pydantic import BaseModel
-from ollama import chat
+from llm_client import llm_chat, summarize_calls, collect_calls, run_with_client
 import logging
 import subprocess
+from render_worker import worker_available, submit_render
+from code_check import validate_scene
+from error_parser import extract_error, hit_rate
+from code_patch import apply_edits, PatchError
+from tracing import tracer, span
 
 model = "qwen2.5-coder:0.5b"
+# Static-check fixes allowed per render attempt; these don't use up a render
+MAX_STATIC_FIXES = 3
+# "patch" asks the fixer for find/replace edits instead of re-emitting the whole program
+FIX_MODE = "patch"
+
+# One entry per fix attempt: mode, whether it worked, tokens generated, latency
+fix_stats = []
+# The current job's entries, as llm_client does for calls
+_job_fixes = contextvars.ContextVar("job_fixes", default=None)
 
 # --- Logging Setup ---
 logging.basicConfig(
@@ -31,12 +52,18 @@ class ErrorAnalysisJson(BaseModel):
 class CodeFixJson(BaseModel):
     code: str
 
+class CodeEdit(BaseModel):
+    find: str
+    replace: str
+
+class CodePatchJson(BaseModel):
+    edits: list[CodeEdit]
+
 
 # --- Prompt Generator ---
 async def generate_prompt(user_input: str) -> str:
     log("Thought: Generating enriched prompt.")
-    response = await asyncio.to_thread(
-        chat,
+    response = await llm_chat(
         model=model,
         messages=[
             {
@@ -57,10 +84,15 @@ async def generate_prompt(user_input: str) -> str:
 
 
 # --- Error Analysis Agent ---
-async def analyze_error(error_text: str) -> str:
+async def analyze_error(error_text: str, code: str | None = None) -> str:
+    summary = extract_error(error_text, code)
+    log(hit_rate())
+    if summary is not None:
+        log(f"Observation: Key error extracted locally: {summary}")
+        return summary
+
     log("Action: Analyzing error with error analysis agent.")
-    response = await asyncio.to_thread(
-        chat,
+    response = await llm_chat(
         model=model,
         messages=[
             {
@@ -81,10 +113,64 @@ async def analyze_error(error_text: str) -> str:
 
 
 # --- Bug Fix Agent ---
-async def fix_code_agent(code: str, error: str) -> str:
+def record_fix(mode: str, ok: bool, response, started: float):
+    entry = {"mode": mode, "ok": ok, "tokens": response.eval_count or 0, "latency": time.perf_counter() - started}
+    fix_stats.append(entry)
+    if _job_fixes.get() is not None:
+        _job_fixes.get().append(entry)
+    log(f"Observation: {mode} fix {'applied' if ok else 'rejected'} ({entry['tokens']} tokens, {entry['latency']:.2f}s).")
+
+
+def summarize_fixes(stats=None):
+    if stats is None:
+        stats = fix_stats if _job_fixes.get() is None else _job_fixes.get()
+    lines = []
+    for mode in ("patch", "rewrite"):
+        entries = [e for e in stats if e["mode"] == mode]
+        if entries:
+            lines.append(
+                f"{mode}: {sum(e['ok'] for e in entries)}/{len(entries)} applied, "
+                f"avg {sum(e['tokens'] for e in entries) / len(entries):.0f} tokens, "
+                f"avg {sum(e['latency'] for e in entries) / len(entries):.2f}s"
+            )
+    return "Fixes: " + (" | ".join(lines) or "none")
+
+
+async def patch_code_agent(code: str, error: str) -> str | None:
+    log("Action: Asking for a patch based on error analysis.")
+    started = time.perf_counter()
+    response = await llm_chat(
+        model=model,
+        messages=[
+            {
+                'role': 'system',
+                'content': (
+                    "You are a Manim Python code fixer. "
+                    "Given the existing buggy code and a key error message, return the smallest list of edits that fixes it. "
+                    "Each edit has `find`, an exact snippet copied from the code that occurs only once, "
+                    "and `replace`, the text to put in its place. Do not return the whole program."
+                )
+            },
+            {'role': 'user', 'content': f"Code:\n{code}\n\nError:\n{error}"},
+        ],
+        format=CodePatchJson.model_json_schema(),
+        options={'temperature': 0.2},
+    )
+    try:
+        patch = CodePatchJson.model_validate_json(response.message.content)
+        fixed_code = apply_edits(code, patch.edits)
+    except (ValueError, PatchError) as e:
+        record_fix("patch", False, response, started)
+        log(f"Observation: Patch did not apply cleanly ({e}); falling back to a full rewrite.")
+        return None
+    record_fix("patch", True, response, started)
+    return fixed_code
+
+
+async def rewrite_code_agent(code: str, error: str) -> str:
     log("Action: Fixing code based on error analysis.")
-    response = await asyncio.to_thread(
-        chat,
+    started = time.perf_counter()
+    response = await llm_chat(
         model=model,
         messages=[
             {
@@ -101,16 +187,31 @@ async def fix_code_agent(code: str, error: str) -> str:
         options={'temperature': 0.2},
     )
     fixed_code = CodeFixJson.model_validate_json(response.message.content).code
+    record_fix("rewrite", True, response, started)
+    return fixed_code
+
+
+async def fix_code_agent(code: str, error: str) -> str:
+    with span("fix_agent", mode=FIX_MODE, code_chars=len(code)):
+        return await _fix_code(code, error)
+
+
+async def _fix_code(code: str, error: str) -> str:
+    if FIX_MODE == "patch":
+        fixed_code = await patch_code_agent(code, error)
+        if fixed_code is not None:
+            log("Observation: Fixed code generated from patch.")
+            return fixed_code
+    fixed_code = await rewrite_code_agent(code, error)
     log("Observation: Fixed code generated.")
     return fixed_code
 
 
 # --- Manim Code Generator ---
-async def generate_code(prompt: str) -> SceneJson:
+async def generate_code(prompt: str, model_name: str = model, options: dict | None = None) -> SceneJson:
     log("Thought: Generating Manim Python code.")
-    response = await asyncio.to_thread(
-        chat,
-        model=model,
+    response = await llm_chat(
+        model=model_name,
         messages=[
             {
                 'role': 'system',
@@ -124,7 +225,7 @@ async def generate_code(prompt: str) -> SceneJson:
             {'role': 'user', 'content': prompt},
         ],
         format=SceneJson.model_json_schema(),
-        options={'temperature': 0},
+        options=options or {'temperature': 0},
     )
     scene = SceneJson.model_validate_json(response.message.content)
     log(f"Observation: Code generated for scene `{scene.classname}`.")
@@ -132,62 +233,330 @@ async def generate_code(prompt: str) -> SceneJson:
 
 
 # --- Save Code to File ---
-def save_code_to_file(code: str):
-    with open("main.py", "w") as f:
+def save_code_to_file(code: str, workdir: str = "."):
+    os.makedirs(workdir, exist_ok=True)
+    with open(os.path.join(workdir, "main.py"), "w") as f:
         f.write(code)
-    log("Observation: Code written to main.py")
+    log(f"Observation: Code written to {os.path.join(workdir, 'main.py')}")
+
+
+def find_output_video(workdir: str, classname: str):
+    videos = glob.glob(os.path.join(workdir, "media", "videos", "main", "*", f"{classname}.mp4"))
+    return os.path.abspath(max(videos, key=os.path.getmtime)) if videos else None
+
+
+@contextmanager
+def timed_stage(timings: dict, name: str):
+    started = time.perf_counter()
+    try:
+        with span(name):
+            yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+# --- Render Tiers ---
+# Retries only need to know whether the scene runs: the probe renders just the
+# last frame at a low frame rate. The requested quality is encoded once, after
+# a probe has passed. Nothing is ever previewed (servers are headless).
+QUALITY = "l"
+RENDER_TIERS = {
+    "probe": {
+        "quality": "l",
+        "flags": ["-s", "--frame_rate", "5"],
+        "config": {"save_last_frame": True, "write_to_movie": False, "frame_rate": 5},
+    },
+    "full": {
+        "quality": QUALITY,
+        "flags": [],
+        "config": {},
+    },
+}
 
 
 # --- Run Manim ---
-async def run_manim(classname: str):
-    log(f"Action: Running Manim for class `{classname}`.")
+async def run_manim(classname: str, code: str | None = None, tier: str = "full", workdir: str = "."):
+    with span("render", tier=tier, classname=classname) as render_span:
+        returncode, stdout, stderr = await _run_manim(classname, code, tier, workdir)
+        render_span.set(returncode=returncode, stderr_bytes=len(stderr))
+    return returncode, stdout, stderr
+
+
+async def _run_manim(classname: str, code: str | None, tier: str, workdir: str):
+    settings = RENDER_TIERS[tier]
+    if code is not None and worker_available():
+        # A warm worker (`python render_worker.py`) skips uv + interpreter + Manim import
+        log(f"Action: Submitting `{classname}` to the render worker ({tier}).")
+        try:
+            result = await submit_render(code, classname, quality=settings["quality"], workdir=workdir, config=settings["config"])
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Socket left behind by a worker that crashed or was killed
+            log("Observation: Render worker is not responding, rendering with uv run manim instead.")
+        else:
+            log(f"Observation: Render worker finished in {result['timings']['total']:.2f}s (exit {result['returncode']}).")
+            if result["returncode"] == 0:
+                return 0, f"File ready at {result['output_path']}", ""
+            return result["returncode"], "", result["traceback"] or f"Render failed with exit code {result['returncode']}"
+
+    log(f"Action: Running Manim for class `{classname}` ({tier}).")
     process = await asyncio.create_subprocess_exec(
-        "uv", "run", "manim", "-pql", "main.py", classname,
+        "uv", "run", "manim", f"-q{settings['quality']}", *settings["flags"], "main.py", classname,
         stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+        stderr=asyncio.subprocess.PIPE,
+        cwd=workdir,
     )
-    stdout, stderr = await process.communicate()
-    return stdout.decode(), stderr.decode()
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        # A losing speculative candidate: don't leave its render running
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, stdout.decode(), stderr.decode()
+
+
+# --- Speculative Candidates ---
+# K candidates are generated with different temperatures/seeds (and models,
+# cycling through SPECULATIVE_MODELS), probe-rendered side by side in their
+# own workdirs, and the first one whose probe passes wins.
+SPECULATIVE_FOLDER = "speculative"
+SPECULATIVE_STATS_FILE = ".speculative_stats.json"
+SPECULATIVE_MODELS = [model]
+
+
+def candidate_settings(index: int):
+    # Candidate 0 is the deterministic (and cacheable) baseline
+    model_name = SPECULATIVE_MODELS[index % len(SPECULATIVE_MODELS)]
+    if index == 0:
+        return model_name, {'temperature': 0}
+    return model_name, {'temperature': min(0.3 + 0.2 * index, 1.0), 'seed': index}
+
+
+# Counted in memory for this process and merged into the file once, by
+# flush_speculative_stats(), so concurrent jobs never race on it
+speculative_stats = {"runs": 0, "no_winner": 0, "wins": {}}
+
+
+def load_speculative_stats():
+    try:
+        with open(SPECULATIVE_STATS_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"runs": 0, "no_winner": 0, "wins": {}}
+
+
+def record_speculative_result(winner: int | None):
+    speculative_stats["runs"] += 1
+    if winner is None:
+        speculative_stats["no_winner"] += 1
+    else:
+        speculative_stats["wins"][str(winner)] = speculative_stats["wins"].get(str(winner), 0) + 1
+
+    wins = ", ".join(f"#{i}: {n}" for i, n in sorted(speculative_stats["wins"].items(), key=lambda item: int(item[0])))
+    log(f"📊 Speculative wins over {speculative_stats['runs']} runs this session: {wins or 'none'} ({speculative_stats['no_winner']} without a winner)")
+
+
+def flush_speculative_stats():
+    if not speculative_stats["runs"]:
+        return
+    stats = load_speculative_stats()
+    stats["runs"] += speculative_stats["runs"]
+    stats["no_winner"] += speculative_stats["no_winner"]
+    for index, count in speculative_stats["wins"].items():
+        stats["wins"][index] = stats["wins"].get(index, 0) + count
+
+    tmp_path = f"{SPECULATIVE_STATS_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stats, f, indent=2)
+    os.replace(tmp_path, SPECULATIVE_STATS_FILE)
+    speculative_stats.update(runs=0, no_winner=0, wins={})
+
+
+async def speculative_code(prompt: str, k: int, concurrency: int, workdir: str = "."):
+    renders = asyncio.Semaphore(concurrency)
+
+    async def candidate(index: int):
+        model_name, options = candidate_settings(index)
+        scene = await generate_code(prompt, model_name=model_name, options=options)
+        issues = validate_scene(scene.code, scene.classname)
+        if issues:
+            return index, scene, 1, "\n".join(issues)
+
+        candidate_dir = os.path.join(workdir, SPECULATIVE_FOLDER, str(index))
+        save_code_to_file(scene.code, candidate_dir)
+        async with renders:
+            returncode, _, stderr = await run_manim(scene.classname, scene.code, tier="probe", workdir=candidate_dir)
+        return index, scene, returncode, stderr
+
+    log(f"Thought: Racing {k} speculative candidates ({concurrency} concurrent probe renders).")
+    tasks = [asyncio.create_task(candidate(i)) for i in range(k)]
+    results = {}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                index, scene, returncode, stderr = await next_done
+            except Exception as e:
+                log(f"Observation: A candidate failed before rendering: {e}")
+                continue
+            results[index] = (scene, stderr)
+            if returncode == 0:
+                log(f"Observation: Candidate #{index} passed its probe first.")
+                record_speculative_result(index)
+                return scene, True, ""
+            log(f"Observation: Candidate #{index} failed its probe.")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    record_speculative_result(None)
+    if not results:
+        return None, False, ""
+    # Nothing passed: repair the lowest-index candidate that produced code
+    scene, stderr = results[min(results)]
+    return scene, False, stderr
 
 
 # --- Main Agent Loop ---
-async def react_manim_agent(user_input: str):
+async def react_manim_agent(user_input: str, speculative: int = 0, concurrency: int = 2, workdir: str = "."):
+    # LLM calls and fixes counted for this request alone, even with other jobs running alongside
+    fixes = []
+    token = _job_fixes.set(fixes)
+    try:
+        with collect_calls() as calls:
+            result = await _react_manim_agent(user_input, speculative, concurrency, workdir)
+    finally:
+        _job_fixes.reset(token)
+
+    result["llm"] = {
+        "calls": len(calls),
+        "cached": sum(c["cached"] for c in calls),
+        "tokens": sum(c["tokens"] for c in calls if not c["cached"]),
+        "latency": sum(c["latency"] for c in calls),
+    }
+    result["fixes"] = {"total": len(fixes), "applied": sum(f["ok"] for f in fixes)}
+    return result
+
+
+async def _react_manim_agent(user_input: str, speculative: int, concurrency: int, workdir: str):
     log(f"\n🎨 New Request: {user_input}")
-    
-    prompt = await generate_prompt(user_input)
-    scene = await generate_code(prompt)
+    started = time.perf_counter()
+    first_success = {}
+    timings = {}
+    result = {"status": "failed", "attempts": 0, "timings": timings, "output_path": None}
+
+    def finish():
+        for tier in RENDER_TIERS:
+            if tier in first_success:
+                elapsed, attempt = first_success[tier]
+                log(f"⏱️ Time to first {tier} success: {elapsed:.2f}s (attempt {attempt})")
+            else:
+                log(f"⏱️ Time to first {tier} success: never")
+        log(summarize_calls())
+        log(summarize_fixes())
+        timings["total"] = time.perf_counter() - started
+        return result
+
+    with timed_stage(timings, "prompt"):
+        prompt = await generate_prompt(user_input)
+    scene, probe_passed, speculative_error = None, False, ""
+    with timed_stage(timings, "codegen"):
+        if speculative > 1:
+            scene, probe_passed, speculative_error = await speculative_code(prompt, speculative, concurrency, workdir)
+        if scene is None:
+            scene = await generate_code(prompt)
     current_code = scene.code
     current_classname = scene.classname
 
+    if speculative_error:
+        log("❌ No speculative candidate passed its probe:")
+        log(speculative_error)
+        with timed_stage(timings, "fix"):
+            current_code = await fix_code_agent(current_code, await analyze_error(speculative_error, current_code))
+
     for attempt in range(1, 4):
         log(f"\n--- 🔁 Attempt {attempt}/3 ---")
+        result["attempts"] = attempt
+        with span("attempt", index=attempt):
+            with timed_stage(timings, "static_check"):
+                issues = validate_scene(current_code, current_classname)
+                for _ in range(MAX_STATIC_FIXES):
+                    if not issues:
+                        break
+                    log("❌ Static check failed, skipping render:")
+                    log("\n".join(issues))
+                    current_code = await fix_code_agent(current_code, "\n".join(issues))
+                    issues = validate_scene(current_code, current_classname)
+
+            if issues:
+                # The last fix is checked too: nothing statically broken is ever rendered
+                log(f"🛑 Final Result: still failing the static check after {MAX_STATIC_FIXES} fixes:")
+                log("\n".join(issues))
+                return finish()
 
-        save_code_to_file(current_code)
-        print(current_code)
-        stdout, stderr = await run_manim(current_classname)
+            save_code_to_file(current_code, workdir)
+            print(current_code)
 
-        if stderr.strip() == "":
-            log("✅ Final Result: Manim rendered successfully!")
-            log(stdout)
-            return
+            # Manim writes progress bars and warnings to stderr, so only the exit code means failure
+            if probe_passed:
+                # The speculative winner has already been probed
+                returncode, probe_passed = 0, False
+            else:
+                with timed_stage(timings, "probe"):
+                    returncode, stdout, stderr = await run_manim(current_classname, current_code, tier="probe", workdir=workdir)
+            if returncode == 0:
+                first_success.setdefault("probe", (time.perf_counter() - started, attempt))
+                with timed_stage(timings, "full"):
+                    returncode, stdout, stderr = await run_manim(current_classname, current_code, tier="full", workdir=workdir)
 
-        log("❌ Error during Manim rendering:")
-        log(stderr)
+            if returncode == 0:
+                first_success.setdefault("full", (time.perf_counter() - started, attempt))
+                log("✅ Final Result: Manim rendered successfully!")
+                log(stdout)
+                result["status"] = "success"
+                result["output_path"] = find_output_video(workdir, current_classname)
+                return finish()
 
-        key_error = await analyze_error(stderr)
-        current_code = await fix_code_agent(current_code, key_error)
+            log("❌ Error during Manim rendering:")
+            log(stderr)
+
+            with timed_stage(timings, "fix"):
+                key_error = await analyze_error(stderr, current_code)
+                current_code = await fix_code_agent(current_code, key_error)
 
     log("🛑 Final Result: Failed after 3 attempts. Please check `agent.log` for full trace.")
+    return finish()
 
 
 # --- CLI Entry ---
+async def repl(speculative: int = 0, concurrency: int = 2):
+    # One event loop for the whole session, so Ollama connections stay open between turns
+    while True:
+        user_input = (await asyncio.to_thread(input, "🎨 Enter scene to generate (or type 'exit'): ")).strip()
+        if user_input.lower() == "exit":
+            print("👋 Goodbye!")
+            break
+        with span("request", prompt=user_input[:80]):
+            await react_manim_agent(user_input, speculative, concurrency)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ReAct agent that generates and renders Manim scenes.")
+    parser.add_argument("--speculative", type=int, default=0, metavar="K", help="race K code candidates per request (0 = off)")
+    parser.add_argument("--concurrency", type=int, default=2, help="probe renders allowed at once in speculative mode")
+    parser.add_argument("--models", nargs="+", default=[model], help="models cycled across speculative candidates")
+    parser.add_argument("--fix-mode", choices=["patch", "rewrite"], default=FIX_MODE, help="how the fixer returns corrected code")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome/Perfetto trace of the session to PATH on exit")
+    args = parser.parse_args()
+    SPECULATIVE_MODELS = args.models
+    FIX_MODE = args.fix_mode
+    if args.trace:
+        tracer.enable()
+
     try:
-        while True:
-            user_input = input("🎨 Enter scene to generate (or type 'exit'): ").strip()
-            if user_input.lower() == "exit":
-                print("👋 Goodbye!")
-                break
-            asyncio.run(react_manim_agent(user_input))
+        run_with_client(repl(args.speculative, args.concurrency))
     except KeyboardInterrupt:
         print("\n👋 Interrupted. Exiting.")
+    finally:
+        flush_speculative_stats()
+        tracer.finish(args.trace)
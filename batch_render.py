@@ -0,0 +1,99 @@
+import sys
+import json
+from textwrap import wrap
+from manim import *
+from render_cache import render_cache
+
+# Rendered videos land where `manim -pql main_temp.py text_<i>` puts them,
+# so combine_audio_video() finds them at the same paths in batch mode.
+SCRIPT_NAME = "main_temp.py"
+QUALITY = "low_quality"
+
+# === Parameterized Q&A Scene ===
+class QAScene(Scene):
+    def __init__(self, line1, line2, wait_time=3, template="paragraph", **kwargs):
+        self.line1 = line1
+        self.line2 = line2
+        self.wait_time = wait_time
+        self.template = template
+        super().__init__(**kwargs)
+
+    def construct(self):
+        if self.template == "text":
+            self.construct_text()
+        else:
+            self.construct_paragraph()
+
+    # Same layout as the script written by demo_english.scene_generator()
+    def construct_paragraph(self):
+        t1 = Paragraph("\n".join(wrap(self.line1, width=40)), alignment='center', font_size=52).scale_to_fit_width(config.frame_width * 0.9)
+        t1.set_color(YELLOW)
+        t2 = Paragraph("\n".join(wrap(self.line2, width=60)), alignment='center', font_size=64).scale_to_fit_width(config.frame_width * 0.9)
+        t2.set_color(GREEN)
+        group = VGroup(t1, t2).arrange(DOWN, buff=0.8).move_to(ORIGIN)
+        self.play(FadeIn(group, shift=UP, scale=0.9))
+        self.wait(self.wait_time)
+        self.play(FadeOut(group, shift=DOWN))
+
+    # Same layout as the script written by demo_hindi.scene_generator()
+    def construct_text(self):
+        t1 = Text(self.line1, font_size=48)
+        t1[:].color = YELLOW
+        t2 = Text(self.line2, font_size=42)
+        t2[:].color = GREEN
+        t3 = VGroup(t1, t2)
+        t3.arrange(DOWN)
+        self.play(Write(t3))
+        self.wait(self.wait_time)
+
+# === Render One Scene In-Process ===
+def render_scene(line1, line2, classname=1, wait_time=3, template="paragraph", media_dir="media"):
+    scene_name = f"text_{classname}"
+    quality = QUALITIES[QUALITY]
+    resolution = f"{quality['pixel_height']}p{quality['frame_rate']}"
+    video_path = f"{media_dir}/videos/{SCRIPT_NAME[:-3]}/{resolution}/{scene_name}.mp4"
+
+    content = json.dumps([template, line1, line2, wait_time], ensure_ascii=False)
+    cache_key = render_cache.key(content, QUALITY)
+    if render_cache.fetch(cache_key, video_path):
+        return video_path, scene_name
+
+    with tempconfig({
+        "input_file": SCRIPT_NAME,
+        "output_file": scene_name,
+        "media_dir": media_dir,
+        "pixel_width": quality["pixel_width"],
+        "pixel_height": quality["pixel_height"],
+        "frame_rate": quality["frame_rate"],
+        "preview": False,
+    }):
+        QAScene(line1, line2, wait_time=wait_time, template=template).render()
+
+    render_cache.store(cache_key, video_path)
+    return video_path, scene_name
+
+# === Render a Whole Deck In One Process ===
+def render_batch(data_list, key1="Question", key2="Answer", template="paragraph", wait_times=None):
+    rendered = []
+    for i, item in enumerate(data_list, start=1):
+        line1 = item.get(key1, "").strip()
+        line2 = item.get(key2, "").strip()
+        if not line1 or not line2:
+            continue
+
+        wait_time = (wait_times or {}).get(i, 3)
+        print(f"🎬 Batch scene {i}: {line1} | {line2} | Wait: {wait_time}s")
+        video_path, _ = render_scene(line1, line2, classname=i, wait_time=wait_time, template=template)
+        rendered.append((i, video_path))
+    return rendered
+
+if __name__ == "__main__":
+    # Video-only render of a deck, e.g. `python batch_render.py questions.json text`
+    json_file = sys.argv[1] if len(sys.argv) > 1 else "agents.json"
+    template = sys.argv[2] if len(sys.argv) > 2 else "paragraph"
+
+    with open(json_file, "r", encoding="utf-8") as f:
+        data_list = json.load(f)
+
+    for i, path in render_batch(data_list, template=template):
+        print(f"✅ Scene {i}: {path}")
@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import shutil
+import argparse
+import resource
+import tempfile
+import traceback
+import subprocess
+import numpy as np
+
+# Rough speaking rate of Kokoro at speed 1.0, used to give fake narration a realistic length
+CHARS_PER_SECOND = 14.0
+SAMPLE_RATE = 24000
+RESULTS_FOLDER = "bench_results"
+AGENT_FOLDER = "auto-scene-generator"
+# Deck fixtures checked by `python benchmark.py smoke`
+SMOKE_DECKS = {"english": "agents.json", "hindi": "questions.json"}
+# Fake narration is cached apart from anything the real model produced
+FAKE_MODEL_FINGERPRINT = "benchmark-fake-kokoro"
+
+# Where the demos write, besides the working folder itself: Manim's media/ tree
+# (partial movie files included), per-scene audio/video, HLS segments and the caches
+OUTPUT_FOLDERS = ("media", "output_scenes", "output_hls", "render_jobs", ".render_cache", ".tts_cache", ".g2p_cache")
+
+# Lower is better for every compared metric except throughput
+HIGHER_IS_BETTER = {"scenes_per_minute"}
+
+# === Offline Stand-Ins ===
+def fake_speech(text, realtime_factor=0.0):
+    """Deterministic audio as long as Kokoro would roughly make it: a quiet tone seeded by the text."""
+    duration = 0.3 + len(text) / CHARS_PER_SECOND
+    if realtime_factor:
+        time.sleep(duration * realtime_factor)
+    t = np.arange(int(duration * SAMPLE_RATE), dtype=np.float32) / SAMPLE_RATE
+    pitch = 110 + sum(text.encode("utf-8")) % 220
+    return (0.1 * np.sin(2 * np.pi * pitch * t)).astype(np.float32)
+
+class FakeKokoro:
+    def __init__(self, realtime_factor=0.0):
+        self.realtime_factor = realtime_factor
+
+    def create(self, text, voice=None, speed=1.0, lang=None, is_phonemes=False):
+        return fake_speech(text, self.realtime_factor), SAMPLE_RATE
+
+    async def create_stream(self, text, voice=None, speed=1.0, lang=None):
+        # One chunk per sentence, like Kokoro's own batching
+        for sentence in filter(None, (s.strip() for s in text.replace("!", ".").replace("?", ".").split("."))):
+            await asyncio.sleep(0)
+            yield fake_speech(sentence, self.realtime_factor), SAMPLE_RATE
+
+# === Metrics ===
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return {
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_child_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+def file_snapshot(folders=OUTPUT_FOLDERS):
+    """(mtime_ns, size) of every file in the working folder and under the output folders."""
+    files = {}
+    paths = [entry.path for entry in os.scandir(".") if entry.is_file()]
+    for folder in folders:
+        paths += [os.path.join(parent, name) for parent, _, names in os.walk(folder) for name in names]
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def bytes_written(before, after):
+    # New or rewritten files count in full, so outputs left by an earlier run are
+    # not mistaken for free; files created and deleted within the run are missed
+    return sum(size for path, (mtime, size) in after.items() if before.get(path, (None, 0))[0] != mtime)
+
+# === Demo Pipelines ===
+def bench_demo(target, fixture, options, realtime_factor, warm_cache):
+    import tts_cache
+    from tracing import tracer, count_processes
+    from deck import validate_deck
+
+    with open(fixture, "r", encoding="utf-8") as f:
+        _, scenes = validate_deck(json.load(f), "Question", "Answer")
+
+    # Every run reports only its own spans and processes, even several in one process (smoke)
+    tracer.reset()
+    tracer.enable()
+    # Cache keys fingerprint the Kokoro files, which a benchmark doesn't need
+    real_fingerprint = tts_cache.model_fingerprint
+    tts_cache.model_fingerprint = lambda paths=None: FAKE_MODEL_FINGERPRINT
+    files_before = file_snapshot()
+    started = time.perf_counter()
+    try:
+        with count_processes() as spawned:
+            if target == "english":
+                import demo_english as demo
+                demo._kokoro = FakeKokoro(realtime_factor)
+            else:
+                import demo_hindi as demo
+                demo._kokoro = FakeKokoro(realtime_factor)
+                demo._g2p = lambda text: (text, None)
+                # Text goes to the fake Kokoro as its own "phonemes"
+                demo.phonemize_deck = lambda texts, **kwargs: list(texts)
+
+            demo.render_cache.enabled = warm_cache
+            demo.audio_cache.enabled = warm_cache
+
+            if target == "english" and options.get("single_encode"):
+                report = asyncio.run(demo.main_single_encode(fixture, "Question", "Answer"))
+            elif target == "english" and options.get("pipeline"):
+                report = asyncio.run(demo.main_pipelined(fixture, "Question", "Answer", fast_cards=options["fast_cards"]))
+            elif target == "english":
+                report = asyncio.run(demo.main(fixture, "Question", "Answer", batch=options["batch"], workers=options["workers"], single_mux=options["single_mux"],
+                                      fast_cards=options["fast_cards"]))
+            else:
+                report = demo.main(fixture, "Question", "Answer", batch=options["batch"], workers=options["workers"], single_mux=options["single_mux"])
+    finally:
+        tts_cache.model_fingerprint = real_fingerprint
+    wall = time.perf_counter() - started
+    written = bytes_written(files_before, file_snapshot())
+
+    return {
+        "scenes": len(scenes),
+        "wall_seconds": wall,
+        "scenes_per_minute": len(scenes) / wall * 60 if wall else 0.0,
+        "stages": tracer.stage_stats(),
+        **peak_rss_mb(),
+        "processes": dict(spawned),
+        # Everything the run left on disk, next to what the runner itself accounts for
+        "disk_mb": written / 1024 ** 2,
+        "output_mb": report["bytes_written"] / 1024 ** 2,
+    }
+
+# === Agent Loop (its own uv project, so run there) ===
+def bench_agent(fixture, output_path, llm_tps):
+    command = ["uv", "run", "python", "benchmark_agent.py", fixture, "--output", os.path.abspath(output_path), "--llm-tps", str(llm_tps)]
+    subprocess.run(command, cwd=AGENT_FOLDER, check=True)
+    with open(output_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# === Smoke Run: Every Fixture Deck, No Model Files ===
+def smoke(options):
+    """Run each demo on its fixture deck in a scratch folder without the Kokoro files, cold and warm."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="bench_smoke_") as scratch:
+        for deck in SMOKE_DECKS.values():
+            shutil.copy(os.path.join(root, deck), scratch)
+        cwd = os.getcwd()
+        os.chdir(scratch)
+        os.makedirs("output_scenes", exist_ok=True)
+        try:
+            for target, deck in SMOKE_DECKS.items():
+                for warm_cache in (False, True):
+                    label = f"{target} {deck} ({'warm' if warm_cache else 'cold'} cache)"
+                    try:
+                        result = bench_demo(target, os.path.abspath(deck), options, 0.0, warm_cache)
+                    except Exception:
+                        failures.append(label)
+                        print(f"❌ {label}\n{traceback.format_exc()}")
+                        continue
+                    print(f"✅ {label}: {result['scenes']} scenes in {result['wall_seconds']:.1f}s")
+        finally:
+            os.chdir(cwd)
+    return failures
+
+# === Baseline Comparison ===
+def flatten(result):
+    metrics = {
+        "wall_seconds": result["wall_seconds"],
+        "scenes_per_minute": result["scenes_per_minute"],
+        "peak_rss_mb": result["peak_rss_mb"],
+        "ffmpeg_processes": result["processes"].get("ffmpeg", 0),
+    }
+    if result.get("disk_mb") is not None:
+        metrics["disk_mb"] = result["disk_mb"]
+    for name, stats in result["stages"].items():
+        metrics[f"{name}.p50_ms"] = stats["p50_ms"]
+        metrics[f"{name}.p95_ms"] = stats["p95_ms"]
+    return metrics
+
+def compare(result, baseline, threshold):
+    current, previous = flatten(result), flatten(baseline)
+    regressions = []
+    print(f"{'metric':<28} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name in sorted(set(current) | set(previous)):
+        if name not in current or name not in previous:
+            print(f"{name:<28} {previous.get(name, '-'):>12} {current.get(name, '-'):>12}")
+            continue
+        before, after = previous[name], current[name]
+        change = (after - before) / before if before else 0.0
+        worse = -change if name in HIGHER_IS_BETTER else change
+        flag = " ⚠️" if worse > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<28} {before:>12.2f} {after:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the deck pipelines and the scene agent without Kokoro or Ollama.")
+    parser.add_argument("target", choices=["english", "hindi", "agent", "smoke"], help="smoke: run both demos on their fixture decks without model files")
+    parser.add_argument("fixture", nargs="?", help="deck JSON (english: agents.json, hindi: questions.json) or prompt JSONL (agent: requests.jsonl)")
+    parser.add_argument("--batch", action="store_true")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--single-mux", action="store_true")
+    parser.add_argument("--pipeline", action="store_true", help="english only")
+    parser.add_argument("--fast-cards", action="store_true", help="english only: NumPy-composited text cards instead of Manim renders")
+    parser.add_argument("--single-encode", action="store_true", help="english only: fast cards streamed into one encoder session")
+    parser.add_argument("--tts-rtf", type=float, default=0.0, help="make the fake TTS take this fraction of real time")
+    parser.add_argument("--llm-tps", type=float, default=0.0, help="make the scripted LLM generate at this many tokens/s (0 = instant)")
+    parser.add_argument("--warm-cache", action="store_true", help="leave the render/TTS caches on instead of measuring cold runs")
+    parser.add_argument("--output", help="result file (default bench_results/<target>.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--save-baseline", metavar="PATH", help="also copy this result to PATH")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    options = {"batch": args.batch, "workers": args.workers, "single_mux": args.single_mux, "pipeline": args.pipeline, "fast_cards": args.fast_cards, "single_encode": args.single_encode}
+    if args.target == "smoke":
+        failures = smoke(options)
+        print(f"{'❌' if failures else '✅'} Smoke run: {len(failures)} of {2 * len(SMOKE_DECKS)} runs failed")
+        sys.exit(1 if failures else 0)
+
+    fixture = args.fixture or {"english": "agents.json", "hindi": "questions.json", "agent": "requests.jsonl"}[args.target]
+    output = args.output or os.path.join(RESULTS_FOLDER, f"{args.target}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    if args.target == "agent":
+        result = bench_agent(fixture, output, args.llm_tps)
+    else:
+        result = bench_demo(args.target, os.path.abspath(fixture), options, args.tts_rtf, args.warm_cache)
+    result.update(target=args.target, fixture=fixture, options=options, created=time.time())
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    print(
+        f"📈 {args.target}: {result['scenes']} scenes in {result['wall_seconds']:.1f}s "
+        f"({result['scenes_per_minute']:.1f}/min), peak RSS {result['peak_rss_mb']:.0f} MB, "
+        f"ffmpeg processes {result['processes'].get('ffmpeg', 0)} -> {output}"
+    )
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} metric(s) regressed more than {args.threshold:.0%}")
+            sys.exit(1)
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+
+CHUNK_SIZE = 1 << 16
+
+# === Deck Validation ===
+def validate_deck(data_list, key1="Question", key2="Answer"):
+    errors = []
+    scenes = []
+
+    if not isinstance(data_list, list):
+        return [f"expected a JSON array of items, got {type(data_list).__name__}"], scenes
+
+    for i, item in enumerate(data_list, start=1):
+        error, scene = validate_item(i, item, key1, key2)
+        if error:
+            errors.append(error)
+        elif scene:
+            scenes.append(scene)
+    return errors, scenes
+
+def validate_item(i, item, key1="Question", key2="Answer"):
+    """Check one deck item: (error, None) if it is malformed, (None, None) if it has
+    nothing to show, else (None, (i, line1, line2, include_audio))."""
+    if not isinstance(item, dict):
+        return f"item {i}: expected an object, got {type(item).__name__}", None
+
+    line1 = item.get(key1, "")
+    line2 = item.get(key2, "")
+    include_audio = item.get("include_audio", True)
+
+    if not isinstance(line1, str) or not isinstance(line2, str):
+        return f"item {i}: `{key1}` and `{key2}` must be strings", None
+    if not isinstance(include_audio, bool):
+        return f"item {i}: `include_audio` must be true or false", None
+    if not line1.strip() or not line2.strip():
+        # Skipped by main(), same as today
+        return None, None
+    return None, (i, line1.strip(), line2.strip(), include_audio)
+
+# === Items Checked One At A Time ===
+def valid_scenes(items, key1="Question", key2="Answer"):
+    """Yield (i, line1, line2, include_audio) for each usable item, warning about and skipping malformed ones."""
+    for i, item in enumerate(items, start=1):
+        error, scene = validate_item(i, item, key1, key2)
+        if error:
+            print(f"⚠️ {error}, skipped")
+        elif scene:
+            yield scene
+
+# === Incremental Deck Reader ===
+# JSON's own whitespace, plus the byte order mark some editors put in front
+JSON_WHITESPACE = " \t\r\n\ufeff"
+
+def iter_deck(path, chunk_size=CHUNK_SIZE):
+    """Yield deck items one at a time from a JSON array or a JSONL file, never holding the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        # The first non-blank character decides the format, however far in it is
+        buffer = ""
+        while not buffer:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buffer = chunk.lstrip(JSON_WHITESPACE)
+
+        if not buffer.startswith("["):
+            # JSONL: one item per line
+            for line in (buffer + f.readline()).splitlines():
+                if line.strip():
+                    yield json.loads(line)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        buffer = buffer[1:]
+        count = 0
+        while True:
+            buffer = buffer.lstrip(JSON_WHITESPACE).lstrip(",").lstrip(JSON_WHITESPACE)
+            if buffer.startswith("]"):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as error:
+                more = f.read(chunk_size)
+                if more:
+                    buffer += more
+                    continue
+                if not buffer:
+                    raise ValueError(f"{path}: deck is truncated, the JSON array has no closing ']'") from None
+                raise ValueError(f"{path}: item {count + 1} is truncated or malformed: {error.msg}") from None
+
+            if not buffer[end:].strip(JSON_WHITESPACE):
+                # Nothing after it yet: a number (or true/false/null) may go on in the next chunk
+                more = f.read(chunk_size)
+                if more:
+                    buffer += more
+                    continue
+                yield item
+                raise ValueError(f"{path}: deck is truncated, the JSON array has no closing ']'")
+            count += 1
+            yield item
+            buffer = buffer[end:]  # keep only what hasn't been parsed yet
+
+def missing_model_files(paths=("kokoro-v1.0.onnx", "voices-v1.0.bin")):
+    return [path for path in paths if not os.path.exists(path)]
+
+# === Throughput And Disk Report ===
+def deck_report(scene_count, started, written_paths=(), bytes_written=None):
+    # Named outputs only; Manim's partial movie files come on top (benchmark.py measures both)
+    wall = time.perf_counter() - started
+    if bytes_written is None:
+        bytes_written = sum(os.path.getsize(path) for path in set(written_paths) if os.path.exists(path))
+    print(f"📦 {scene_count} scenes in {wall:.1f}s ({scene_count / wall * 60:.1f}/min), {bytes_written / 1024 ** 2:.1f} MB written to disk")
+    return {"scenes": scene_count, "wall_seconds": wall, "bytes_written": bytes_written}
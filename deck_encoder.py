@@ -0,0 +1,133 @@
+import os
+import time
+import queue
+import threading
+import subprocess
+import numpy as np
+from master_mux import SAMPLE_RATE
+from fast_card import PIXEL_WIDTH, PIXEL_HEIGHT, FRAME_RATE
+from tracing import span
+
+# === One Encoder For The Whole Deck ===
+# Every scene's frames go down one pipe into a single long-lived ffmpeg, its
+# narration down a second one, so there is one encoder start-up, one GOP
+# structure and no per-scene mp4 anywhere. Scene boundaries are kept as frame
+# numbers and become chapters once the deck is done: the mp4 index is only
+# written at the end anyway, so they are added by a stream-copy pass then.
+class DeckEncoder:
+    def __init__(self, output_path, sample_rate=SAMPLE_RATE, frame_rate=FRAME_RATE):
+        self.output_path = output_path
+        self.partial_path = f"{output_path}.partial.mp4"
+        self.chapters_path = f"{output_path}.chapters.txt"
+        self.sample_rate = sample_rate
+        self.frame_rate = frame_rate
+        self.frames = 0
+        self.samples = 0
+        self.chapters = []
+        self.bytes_written = 0
+        self.process = None
+        self.audio_thread = None
+        self.audio_queue = queue.Queue()
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.output_path) or ".", exist_ok=True)
+        audio_read, audio_write = os.pipe()
+        self.started = time.perf_counter()
+        self.process = subprocess.Popen([
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "-s", f"{PIXEL_WIDTH}x{PIXEL_HEIGHT}", "-r", str(self.frame_rate),
+            "-i", "pipe:0",
+            "-f", "f32le", "-ar", str(self.sample_rate), "-ac", "1",
+            "-i", f"pipe:{audio_read}",
+            "-map", "0:v:0", "-map", "1:a:0",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "23",
+            "-c:a", "aac",
+            self.partial_path,
+        ], stdin=subprocess.PIPE, pass_fds=(audio_read,))
+        os.close(audio_read)
+
+        # Its own thread, so ffmpeg can wait on either pipe without the other one deadlocking
+        self.audio_thread = threading.Thread(target=self._feed_audio, args=(audio_write,), daemon=True)
+        self.audio_thread.start()
+        return self
+
+    def _feed_audio(self, fd):
+        try:
+            with open(fd, "wb") as pipe:
+                while (block := self.audio_queue.get()) is not None:
+                    pipe.write(block)
+        except BrokenPipeError:
+            pass  # ffmpeg is gone; the video side reports it
+
+    def add_scene(self, frames, frame_count, audio, title=""):
+        """Queue a scene's narration, padded or cut to its video length, then stream its frames."""
+        start = self.frames
+        end = start + frame_count
+        # Sample positions come from frame numbers, so audio can't drift across the deck
+        wanted = round(end * self.sample_rate / self.frame_rate) - self.samples
+        audio = np.asarray(audio, dtype=np.float32)[:wanted]
+        audio = np.pad(audio, (0, wanted - len(audio)))
+        self.audio_queue.put(audio.tobytes())
+        self.samples += wanted
+
+        try:
+            for frame in frames:
+                self.process.stdin.write(frame)
+                self.frames += 1
+        except BrokenPipeError:
+            raise RuntimeError(f"ffmpeg exited with code {self.process.wait()} while encoding scene '{title}'") from None
+        if self.frames != end:
+            raise ValueError(f"scene '{title}' produced {self.frames - start} frames, expected {frame_count}")
+        self.chapters.append((start, end, title))
+
+    def write_chapters(self):
+        def escape(text):
+            for char in "\\=;#\n":
+                text = text.replace(char, f"\\{char}")
+            return text
+
+        with open(self.chapters_path, "w", encoding="utf-8") as f:
+            f.write(";FFMETADATA1\n")
+            for start, end, title in self.chapters:
+                f.write(f"[CHAPTER]\nTIMEBASE=1/{self.frame_rate}\nSTART={start}\nEND={end}\ntitle={escape(title)}\n")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.audio_queue.put(None)
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.audio_thread.join()
+        returncode = self.process.wait()
+        encode_seconds = time.perf_counter() - self.started
+
+        try:
+            if exc_type is not None or returncode != 0:
+                if exc_type is None:
+                    print(f"⚠️ Deck encoder failed (exit {returncode}), {self.output_path} not written")
+                return False
+
+            self.write_chapters()
+            with span("chapters", chapters=len(self.chapters)) as chapters_span:
+                subprocess.run([
+                    "ffmpeg", "-y", "-loglevel", "error",
+                    "-i", self.partial_path,
+                    "-f", "ffmetadata", "-i", self.chapters_path,
+                    "-map", "0", "-map_chapters", "1",
+                    "-c", "copy", "-movflags", "+faststart",
+                    self.output_path,
+                ], check=True)
+                chapters_span.set(bytes=os.path.getsize(self.output_path))
+
+            self.bytes_written = sum(os.path.getsize(path) for path in (self.partial_path, self.chapters_path, self.output_path))
+            print(
+                f"🎞️ One encoder session: {len(self.chapters)} scenes, {self.frames} frames in {encode_seconds:.1f}s "
+                f"({self.frames / encode_seconds:.0f} fps) -> {self.output_path}"
+            )
+            return False
+        finally:
+            # Never left behind, whether the encode, the chapter pass or the deck itself failed
+            for path in (self.partial_path, self.chapters_path):
+                if os.path.exists(path):
+                    os.remove(path)
@@ -1,16 +1,38 @@
 import os
 import json
+import argparse
 import subprocess
 import asyncio
-import tempfile
-import numpy as np
-import soundfile as sf
+import sys
+import time
 from textwrap import wrap
-from manim import *
-from kokoro_onnx import Kokoro, SAMPLE_RATE
+from startup import lazy_import, timed, print_startup_report
+from tracing import tracer, span
+
+with timed("numpy/soundfile import"):
+    import numpy as np
+    import soundfile as sf
+    from master_mux import mux_deck, MASTER_FOLDER
+    from render_cache import render_cache
+    from tts_cache import audio_cache
+    from audio_stream import AudioAssembler
+    from deck import validate_deck, valid_scenes, iter_deck, missing_model_files, deck_report
+    from hls_stream import HLSWriter, HLS_FOLDER
+
+# Kokoro's fixed output rate (kokoro_onnx.SAMPLE_RATE), kept here so the
+# model runtime is only imported when something is actually synthesized
+SAMPLE_RATE = 24000
 
-# === Initialize Kokoro ===
-kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin")
+# === Lazy Kokoro ===
+_kokoro = None
+
+def get_kokoro():
+    global _kokoro
+    if _kokoro is None:
+        Kokoro = lazy_import("kokoro_onnx", "kokoro_onnx import").Kokoro
+        with timed("kokoro model load"):
+            _kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin")
+    return _kokoro
 
 OUTPUT_FOLDER = "output_scenes"
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
@@ -24,16 +46,19 @@ async def aenumerate(aiter: AsyncIterator, start: int = 0):
         yield i, item
         i += 1
 
-# === Scene Generator ===
-def scene_generator(line1, line2, classname=1, audio_duration=None):
+# === Scene Wait Time ===
+def scene_wait_time(audio_duration=None):
+    # Use audio duration to adjust wait time
+    return max(3, int(audio_duration) + 1) if audio_duration else 3
+
+# === Scene Script Builder ===
+def build_scene_script(line1, line2, classname=1, audio_duration=None):
     scene_name = f"text_{classname}"
-    filename = "main_temp.py"
 
     wrapped_line1 = "\\n".join(wrap(line1.replace('"', '\\"'), width=40))
     wrapped_line2 = "\\n".join(wrap(line2.replace('"', '\\"'), width=60))
 
-    # Use audio duration to adjust wait time
-    wait_time = max(3, int(audio_duration) + 1) if audio_duration else 3
+    wait_time = scene_wait_time(audio_duration)
 
     manim_script = f"""
 from manim import *
@@ -49,42 +74,118 @@ class {scene_name}(Scene):
         self.wait({wait_time})
         self.play(FadeOut(group, shift=DOWN))
 """
+    return manim_script, scene_name
+
+# === Scene Generator ===
+def scene_generator(line1, line2, classname=1, audio_duration=None):
+    filename = "main_temp.py"
+    manim_script, scene_name = build_scene_script(line1, line2, classname, audio_duration)
+    video_path = f"media/videos/{filename[:-3]}/480p15/{scene_name}.mp4"
+
+    cache_key = render_cache.key(manim_script, "-ql", scene_name=scene_name)
+    if render_cache.fetch(cache_key, video_path):
+        return video_path, scene_name
+
     with open(filename, "w", encoding="utf-8") as f:
         f.write(manim_script)
 
-    subprocess.run(["manim", "-pql", filename, scene_name])
-    return f"media/videos/{filename[:-3]}/480p15/{scene_name}.mp4", scene_name
+    result = subprocess.run(["manim", "-pql", filename, scene_name])
+    if result.returncode == 0:
+        render_cache.store(cache_key, video_path)
+    return video_path, scene_name
+
+# === Async Scene Generator (awaits manim instead of blocking) ===
+async def scene_generator_async(line1, line2, classname=1, audio_duration=None):
+    # One script per scene so a later scene can be written while this one renders
+    script_dir = os.path.join(OUTPUT_FOLDER, "scripts", f"scene_{classname}")
+    os.makedirs(script_dir, exist_ok=True)
+    filename = os.path.join(script_dir, "main_temp.py")
+    manim_script, scene_name = build_scene_script(line1, line2, classname, audio_duration)
+    video_path = f"media/videos/main_temp/480p15/{scene_name}.mp4"
+
+    cache_key = render_cache.key(manim_script, "-ql", scene_name=scene_name)
+    if render_cache.fetch(cache_key, video_path):
+        return video_path, scene_name
+
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(manim_script)
+
+    process = await asyncio.create_subprocess_exec("manim", "-pql", filename, scene_name)
+    if await process.wait() == 0:
+        render_cache.store(cache_key, video_path)
+    return video_path, scene_name
 
 # === Audio Generation with Streaming + Disk Write ===
-async def generate_combined_audio(text, output_path, voice="af_heart"):
-    stream = kokoro.create_stream(
-        text=text,
-        voice=voice,
-        speed=1.0,
-        lang="en-us",
-    )
-
-    with tempfile.TemporaryDirectory() as temp_dir:
-        chunk_files = []
-        async for idx, (samples, _) in aenumerate(stream, start=1):
-            chunk_path = os.path.join(temp_dir, f"chunk_{idx}.wav")
-            sf.write(chunk_path, samples, SAMPLE_RATE)
-            print(f"✅ Wrote chunk {idx} to {chunk_path}")
-            chunk_files.append(chunk_path)
-
-        combined_audio = []
-        silence = np.zeros(int(1 * SAMPLE_RATE), dtype=np.float32)  # 1 second silence
-        combined_audio.append(silence)  # Start silence
-
-        for file in chunk_files:
-            audio, _ = sf.read(file, dtype="float32")
-            combined_audio.append(audio)
-
-        combined_audio.append(silence)  # End silence
-        final_audio = np.concatenate(combined_audio)
-        sf.write(output_path, final_audio, SAMPLE_RATE)
-        print(f"🎉 Final audio written: {output_path} ({len(final_audio)/SAMPLE_RATE:.2f}s)")
-        return len(final_audio) / SAMPLE_RATE
+async def generate_combined_audio(text, output_path, voice="af_heart", speech=None):
+    # 1 second of silence on both ends, chunks written straight to the output as they arrive
+    with AudioAssembler(output_path, SAMPLE_RATE) as assembler:
+        await narrate(text, assembler, voice, speech)
+    print(f"🎉 Final audio written: {output_path} ({assembler.duration:.2f}s)")
+    return assembler.duration
+
+async def narrate(text, assembler, voice="af_heart", speech=None):
+    """Write the narration for `text` into an open AudioAssembler, from prepared samples, the TTS cache or Kokoro."""
+    cache_key = audio_cache.key(text, voice, speed=1.0, lang="en-us", sample_rate=SAMPLE_RATE)
+
+    if speech is not None:
+        # Synthesized ahead of time by presynthesize_deck()
+        audio_cache.put(cache_key, speech, SAMPLE_RATE, text)
+    else:
+        cached = audio_cache.get(cache_key)
+        speech = cached[0] if cached is not None else None
+
+    if speech is not None:
+        with span("tts", chars=len(text), source="prepared/cache") as tts_span:
+            assembler.write(speech)
+            tts_span.set(audio_seconds=assembler.duration)
+        return
+
+    with span("tts", chars=len(text), source="kokoro") as tts_span:
+        stream = get_kokoro().create_stream(
+            text=text,
+            voice=voice,
+            speed=1.0,
+            lang="en-us",
+        )
+
+        with audio_cache.writer(cache_key, SAMPLE_RATE, text) as cache_writer:
+            waited = time.perf_counter()
+            async for idx, (samples, _) in aenumerate(stream, start=1):
+                tracer.add("tts_chunk", waited, index=idx, samples=len(samples), audio_seconds=len(samples) / SAMPLE_RATE)
+                assembler.write(samples)
+                cache_writer.write(samples)
+                print(f"✅ Wrote chunk {idx} ({len(samples)/SAMPLE_RATE:.2f}s, running {assembler.duration:.2f}s)")
+                waited = time.perf_counter()
+        tts_span.set(audio_seconds=assembler.duration)
+
+# === Batched Narration For A Whole Deck ===
+def presynthesize_deck(data_list, key1, key2, sessions, intra_op_threads=None, inter_op_threads=1, voice="af_heart"):
+    texts = {}
+    for i, item in enumerate(data_list, start=1):
+        line1 = item.get(key1, "").strip()
+        line2 = item.get(key2, "").strip()
+        if not line1 or not line2 or not item.get("include_audio", True):
+            continue
+
+        text = f"{line1}. {line2}"
+        if audio_cache.duration(audio_cache.key(text, voice, speed=1.0, lang="en-us", sample_rate=SAMPLE_RATE)) is None:
+            texts[i] = text
+
+    if not texts:
+        return {}
+
+    synthesize_batch = lazy_import("tts_batch", "kokoro_onnx import").synthesize_batch
+    with span("tts_batch", items=len(texts), sessions=sessions) as batch_span:
+        results, report = synthesize_batch(
+            list(texts.values()),
+            voice=voice,
+            lang="en-us",
+            sessions=sessions,
+            intra_op_threads=intra_op_threads,
+            inter_op_threads=inter_op_threads,
+        )
+        batch_span.set(audio_seconds=report["audio_seconds"])
+    return {i: samples for i, (samples, _) in zip(texts, results)}
 
 # === Silent Audio Generator ===
 def generate_silent_audio(output_path, duration=4.0):
@@ -94,8 +195,8 @@ def generate_silent_audio(output_path, duration=4.0):
     return duration
 
 # === Combine Audio + Video ===
-def combine_audio_video(video_path, audio_path, output_path):
-    subprocess.run([
+def mux_command(video_path, audio_path, output_path):
+    return [
         "ffmpeg", "-y",
         "-i", video_path,
         "-i", audio_path,
@@ -105,14 +206,49 @@ def combine_audio_video(video_path, audio_path, output_path):
         "-map", "1:a:0",
         "-shortest",
         output_path
-    ])
+    ]
+
+def combine_audio_video(video_path, audio_path, output_path):
+    with span("mux", output=output_path) as mux_span:
+        subprocess.run(mux_command(video_path, audio_path, output_path))
+        mux_span.set(bytes=os.path.getsize(output_path) if os.path.exists(output_path) else 0)
+
+async def combine_audio_video_async(video_path, audio_path, output_path):
+    with span("mux", output=output_path) as mux_span:
+        process = await asyncio.create_subprocess_exec(*mux_command(video_path, audio_path, output_path))
+        await process.wait()
+        mux_span.set(bytes=os.path.getsize(output_path) if os.path.exists(output_path) else 0)
+
+# === Merge Final Videos ===
+def merge_videos(final_videos, output_path="merged_output.mp4"):
+    with open("merge_list.txt", "w") as f:
+        for path in final_videos:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    with span("concat", videos=len(final_videos)) as concat_span:
+        subprocess.run([
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+            "-i", "merge_list.txt", "-c", "copy", output_path
+        ])
+        concat_span.set(bytes=os.path.getsize(output_path) if os.path.exists(output_path) else 0)
+
+    print(f"✅ Final video created: {output_path}")
 
 # === Main Async Runner ===
-async def main(json_file="questions.json", key1="Question", key2="Answer"):
+async def main(json_file="questions.json", key1="Question", key2="Answer", batch=False, workers=1, single_mux=False,
+               tts_sessions=0, intra_op_threads=None, inter_op_threads=1, fast_cards=False):
     with open(json_file, "r", encoding="utf-8") as f:
         data_list = json.load(f)
 
+    prepared_speech = {}
+    if tts_sessions:
+        prepared_speech = presynthesize_deck(data_list, key1, key2, tts_sessions, intra_op_threads, inter_op_threads)
+
     final_videos = []
+    jobs = []
+    scenes = []
+    written = []
+    started = time.perf_counter()
 
     for i, item in enumerate(data_list, start=1):
         line1 = item.get(key1, "").strip()
@@ -122,33 +258,268 @@ async def main(json_file="questions.json", key1="Question", key2="Answer"):
         if not line1 or not line2:
             continue
 
-        print(f"🎬 Scene {i}: {line1} | {line2} | Audio: {include_audio}")
+        with span("scene", index=i, audio=include_audio):
+            print(f"🎬 Scene {i}: {line1} | {line2} | Audio: {include_audio}")
 
-        audio_file = os.path.join(OUTPUT_FOLDER, f"audio_{i}.wav")
-        output_video = os.path.join(OUTPUT_FOLDER, f"scene_{i}.mp4")
+            audio_file = os.path.join(OUTPUT_FOLDER, f"audio_{i}.wav")
+            output_video = os.path.join(OUTPUT_FOLDER, f"scene_{i}.mp4")
 
-        if include_audio:
-            combined_text = f"{line1}. {line2}"
-            audio_duration = await generate_combined_audio(combined_text, audio_file)
-        else:
-            audio_duration = generate_silent_audio(audio_file, duration=4.0)
+            if include_audio:
+                combined_text = f"{line1}. {line2}"
+                audio_duration = await generate_combined_audio(combined_text, audio_file, speech=prepared_speech.pop(i, None))
+            else:
+                audio_duration = generate_silent_audio(audio_file, duration=4.0)
+            written.append(audio_file)
 
-        raw_video_path, _ = scene_generator(line1, line2, classname=i, audio_duration=audio_duration)
+            if fast_cards:
+                # Text rasterized once, frames composited in NumPy and piped to ffmpeg
+                render_card = lazy_import("fast_card", "manim import").render_card
+                with span("render", mode="fast"):
+                    raw_video_path, _ = render_card(line1, line2, classname=i, wait_time=scene_wait_time(audio_duration))
+            elif workers > 1:
+                # Rendered after the loop by the process pool
+                jobs.append({
+                    "index": i,
+                    "line1": line1,
+                    "line2": line2,
+                    "wait_time": scene_wait_time(audio_duration),
+                    "audio_file": audio_file,
+                    "output_video": output_video,
+                })
+                continue
+            elif batch:
+                # Render in this process instead of spawning `manim` per scene
+                render_scene = lazy_import("batch_render", "manim import").render_scene
+                with span("render", mode="batch"):
+                    raw_video_path, _ = render_scene(line1, line2, classname=i, wait_time=scene_wait_time(audio_duration))
+            else:
+                with span("render", mode="subprocess"):
+                    raw_video_path, _ = scene_generator(line1, line2, classname=i, audio_duration=audio_duration)
+            written.append(raw_video_path)
 
-        combine_audio_video(raw_video_path, audio_file, output_video)
-        final_videos.append(output_video)
+            if single_mux:
+                scenes.append((raw_video_path, audio_file))
+                continue
+
+            combine_audio_video(raw_video_path, audio_file, output_video)
+            final_videos.append(output_video)
+
+    if jobs:
+        print(f"🧵 Rendering {len(jobs)} scenes with {workers} workers")
+        render_parallel = lazy_import("render_pool", "manim import").render_parallel
+        with span("render", mode="pool", scenes=len(jobs), workers=workers):
+            raw_video_paths = render_parallel(jobs, workers)
+        written.extend(raw_video_paths)
+        for job, raw_video_path in zip(jobs, raw_video_paths):
+            if single_mux:
+                scenes.append((raw_video_path, job["audio_file"]))
+                continue
+            combine_audio_video(raw_video_path, job["audio_file"], job["output_video"])
+            final_videos.append(job["output_video"])
+
+    if single_mux:
+        # One master audio track, one concat + AAC encode for the whole deck
+        with span("mux_deck", scenes=len(scenes)):
+            mux_deck(scenes, "merged_output.mp4")
+        return deck_report(len(scenes), started, written + [os.path.join(MASTER_FOLDER, "master_audio.wav"), "merged_output.mp4"])
 
     # Merge all final videos
-    with open("merge_list.txt", "w") as f:
-        for path in final_videos:
-            f.write(f"file '{os.path.abspath(path)}'\n")
+    merge_videos(final_videos)
+    return deck_report(len(final_videos), started, written + final_videos + ["merged_output.mp4"])
+
+# === Dry Check: Validate Input, Print Planned Work ===
+def check_deck(json_file="questions.json", key1="Question", key2="Answer", voice="af_heart"):
+    try:
+        with open(json_file, "r", encoding="utf-8") as f:
+            data_list = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Cannot read {json_file}: {e}")
+        return False
+
+    errors, scenes = validate_deck(data_list, key1, key2)
+    narrated = [(i, f"{line1}. {line2}") for i, line1, line2, include_audio in scenes if include_audio]
+    missing = missing_model_files()
+
+    cached = 0
+    if not missing:
+        cached = sum(
+            audio_cache.duration(audio_cache.key(text, voice, speed=1.0, lang="en-us", sample_rate=SAMPLE_RATE)) is not None
+            for _, text in narrated
+        )
+    if missing and narrated:
+        errors.append(f"Kokoro model files missing: {', '.join(missing)}")
+
+    print(f"📋 {json_file}: {len(data_list) if isinstance(data_list, list) else 0} items, {len(scenes)} scenes")
+    print(f"   🔊 narrated: {len(narrated)} ({cached} in TTS cache, {len(narrated) - cached} to synthesize)")
+    print(f"   🤫 silent: {len(scenes) - len(narrated)}")
+    for error in errors:
+        print(f"❌ {error}")
+    print_startup_report()
+    return not errors
+
+# === Pipelined Runner: TTS -> Render -> Mux ===
+async def main_pipelined(json_file="questions.json", key1="Question", key2="Answer", queue_size=2, fast_cards=False):
+    with open(json_file, "r", encoding="utf-8") as f:
+        data_list = json.load(f)
+
+    # Bounded queues keep TTS at most `queue_size` scenes ahead of the renderer
+    render_queue = asyncio.Queue(maxsize=queue_size)
+    mux_queue = asyncio.Queue(maxsize=queue_size)
+    final_videos = []
+    audio_files = []
+    busy = {"tts": 0.0, "render": 0.0, "mux": 0.0}
 
-    subprocess.run([
-        "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-        "-i", "merge_list.txt", "-c", "copy", "merged_output.mp4"
-    ])
+    async def tts_stage():
+        for i, item in enumerate(data_list, start=1):
+            line1 = item.get(key1, "").strip()
+            line2 = item.get(key2, "").strip()
+            include_audio = item.get("include_audio", True)
 
-    print("✅ Final video created: merged_output.mp4")
+            if not line1 or not line2:
+                continue
+
+            print(f"🎬 Scene {i}: {line1} | {line2} | Audio: {include_audio}")
+
+            audio_file = os.path.join(OUTPUT_FOLDER, f"audio_{i}.wav")
+            output_video = os.path.join(OUTPUT_FOLDER, f"scene_{i}.mp4")
+
+            start = time.perf_counter()
+            if include_audio:
+                audio_duration = await generate_combined_audio(f"{line1}. {line2}", audio_file)
+            else:
+                audio_duration = generate_silent_audio(audio_file, duration=4.0)
+            busy["tts"] += time.perf_counter() - start
+            audio_files.append(audio_file)
+
+            await render_queue.put((i, line1, line2, audio_file, output_video, audio_duration))
+        await render_queue.put(None)
+
+    async def render_stage():
+        while (job := await render_queue.get()) is not None:
+            i, line1, line2, audio_file, output_video, audio_duration = job
+            start = time.perf_counter()
+            if fast_cards:
+                render_card = lazy_import("fast_card", "manim import").render_card
+                with span("render", mode="fast", scene=i):
+                    raw_video_path, _ = await asyncio.to_thread(render_card, line1, line2, classname=i, wait_time=scene_wait_time(audio_duration))
+            else:
+                with span("render", mode="async", scene=i):
+                    raw_video_path, _ = await scene_generator_async(line1, line2, classname=i, audio_duration=audio_duration)
+            busy["render"] += time.perf_counter() - start
+            await mux_queue.put((raw_video_path, audio_file, output_video))
+        await mux_queue.put(None)
+
+    async def mux_stage():
+        while (job := await mux_queue.get()) is not None:
+            raw_video_path, audio_file, output_video = job
+            start = time.perf_counter()
+            await combine_audio_video_async(raw_video_path, audio_file, output_video)
+            busy["mux"] += time.perf_counter() - start
+            final_videos.append(output_video)
+
+    start = time.perf_counter()
+    await asyncio.gather(tts_stage(), render_stage(), mux_stage())
+    wall = time.perf_counter() - start
+
+    print(f"⏱️ Pipeline wall time {wall:.1f}s | " + " | ".join(f"{k} {v:.1f}s" for k, v in busy.items()))
+    merge_videos(final_videos)
+    return deck_report(len(final_videos), start, audio_files + final_videos + ["merged_output.mp4"])
+
+# === Single Encoder Session: Every Scene Through One ffmpeg Pipe ===
+async def main_single_encode(json_file="questions.json", key1="Question", key2="Answer", output_path="merged_output.mp4"):
+    # Fast cards only: their frames exist in this process, Manim's go straight into its own encoder
+    fast_card = lazy_import("fast_card", "manim import")
+    DeckEncoder = lazy_import("deck_encoder").DeckEncoder
+
+    started = time.perf_counter()
+    with DeckEncoder(output_path, SAMPLE_RATE, fast_card.FRAME_RATE) as encoder:
+        for i, line1, line2, include_audio in valid_scenes(iter_deck(json_file), key1, key2):
+            with span("scene", index=i, audio=include_audio):
+                print(f"🎬 Scene {i}: {line1} | {line2} | Audio: {include_audio}")
+
+                # Narration stays in memory and goes straight down the encoder's audio pipe
+                if include_audio:
+                    with AudioAssembler(None, SAMPLE_RATE) as assembler:
+                        await narrate(f"{line1}. {line2}", assembler)
+                    audio, audio_duration = assembler.samples, assembler.duration
+                else:
+                    audio_duration = 4.0
+                    audio = np.zeros(int(SAMPLE_RATE * audio_duration), dtype=np.float32)
+
+                wait_time = scene_wait_time(audio_duration)
+                with span("rasterize", scene=i):
+                    sprite, origin = fast_card.rasterize_card(line1, line2)
+                with span("encode_scene", scene=i, frames=fast_card.frame_count(wait_time)):
+                    encoder.add_scene(fast_card.card_frames(sprite, origin, wait_time), fast_card.frame_count(wait_time), audio, title=line1)
+
+    return deck_report(len(encoder.chapters), started, bytes_written=encoder.bytes_written)
+
+# === Streaming Runner: Scenes Go Live One By One In An HLS Playlist ===
+async def main_streaming(deck_file="agents.json", key1="Question", key2="Answer", hls_dir=HLS_FOLDER, fast_cards=False):
+    # The deck is read item by item (JSON array or JSONL) and nothing is kept per scene
+    with HLSWriter(hls_dir) as hls:
+        # Same per-item checks as --check; a malformed item is skipped, not fatal
+        for i, line1, line2, include_audio in valid_scenes(iter_deck(deck_file), key1, key2):
+            with span("scene", index=i, audio=include_audio):
+                print(f"🎬 Scene {i}: {line1} | {line2} | Audio: {include_audio}")
+
+                audio_file = os.path.join(OUTPUT_FOLDER, f"audio_{i}.wav")
+                output_video = os.path.join(OUTPUT_FOLDER, f"scene_{i}.mp4")
+
+                if include_audio:
+                    audio_duration = await generate_combined_audio(f"{line1}. {line2}", audio_file)
+                else:
+                    audio_duration = generate_silent_audio(audio_file, duration=4.0)
+
+                if fast_cards:
+                    render_card = lazy_import("fast_card", "manim import").render_card
+                    with span("render", mode="fast"):
+                        raw_video_path, _ = render_card(line1, line2, classname=i, wait_time=scene_wait_time(audio_duration))
+                else:
+                    with span("render", mode="subprocess"):
+                        raw_video_path, _ = scene_generator(line1, line2, classname=i, audio_duration=audio_duration)
+                combine_audio_video(raw_video_path, audio_file, output_video)
+                with span("segment", scene=i):
+                    hls.append(output_video)
 
 if __name__ == "__main__":
-    asyncio.run(main(json_file="agents.json", key1="Question", key2="Answer"))
+    parser = argparse.ArgumentParser(description="Render narrated Q&A scenes with Manim and Kokoro.")
+    parser.add_argument("json_file", nargs="?", default="agents.json")
+    parser.add_argument("--batch", action="store_true", help="render all scenes in this process")
+    parser.add_argument("--workers", type=int, default=1, help="render scenes in a pool of N processes")
+    parser.add_argument("--pipeline", action="store_true", help="overlap TTS, render and mux of consecutive scenes")
+    parser.add_argument("--queue-size", type=int, default=2, help="max scenes buffered between pipeline stages")
+    parser.add_argument("--single-mux", action="store_true", help="mux one master audio track instead of per-scene muxes")
+    parser.add_argument("--tts-sessions", type=int, default=0, help="synthesize the whole deck up front across N ONNX sessions")
+    parser.add_argument("--intra-op-threads", type=int, default=None, help="ONNX Runtime intra-op threads per TTS session")
+    parser.add_argument("--inter-op-threads", type=int, default=1, help="ONNX Runtime inter-op threads per TTS session")
+    parser.add_argument("--no-cache", action="store_true", help="always re-render and re-synthesize, ignoring the caches")
+    parser.add_argument("--check", action="store_true", help="validate the input and print the planned work, then exit")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome/Perfetto trace of every stage to PATH")
+    parser.add_argument("--stream", action="store_true", help="read the deck incrementally (JSON array or JSONL) and publish scenes to an HLS playlist as they finish")
+    parser.add_argument("--hls-dir", default=HLS_FOLDER, help="where --stream writes playlist.m3u8 and its segments")
+    parser.add_argument("--fast-cards", action="store_true", help="composite the text cards in NumPy and pipe frames to ffmpeg instead of running Manim's frame loop")
+    parser.add_argument("--single-encode", action="store_true", help="stream every fast card into one ffmpeg encoder with a chapter per scene, no per-scene videos")
+    args = parser.parse_args()
+    render_cache.enabled = not args.no_cache
+    audio_cache.enabled = not args.no_cache
+    if args.trace:
+        tracer.enable()
+
+    if args.check:
+        sys.exit(0 if check_deck(json_file=args.json_file, key1="Question", key2="Answer") else 1)
+
+    if args.fast_cards or args.single_encode:
+        lazy_import("fast_card", "manim import").require_verified()
+
+    if args.single_encode:
+        asyncio.run(main_single_encode(json_file=args.json_file, key1="Question", key2="Answer"))
+    elif args.stream:
+        asyncio.run(main_streaming(args.json_file, key1="Question", key2="Answer", hls_dir=args.hls_dir, fast_cards=args.fast_cards))
+    elif args.pipeline:
+        asyncio.run(main_pipelined(json_file=args.json_file, key1="Question", key2="Answer", queue_size=args.queue_size, fast_cards=args.fast_cards))
+    else:
+        asyncio.run(main(json_file=args.json_file, key1="Question", key2="Answer", batch=args.batch, workers=args.workers, single_mux=args.single_mux,
+                         tts_sessions=args.tts_sessions, intra_op_threads=args.intra_op_threads, inter_op_threads=args.inter_op_threads, fast_cards=args.fast_cards))
+    print_startup_report()
+    tracer.finish(args.trace)
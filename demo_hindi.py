@@ -1,15 +1,45 @@
 import json
 import os
+import sys
+import time
+import argparse
 import subprocess
-import soundfile as sf
-import numpy as np
-from manim import *
-from misaki.espeak import EspeakG2P
-from kokoro_onnx import Kokoro
+from startup import lazy_import, timed, print_startup_report
+from tracing import tracer, span
+
+with timed("numpy/soundfile import"):
+    import soundfile as sf
+    import numpy as np
+    from master_mux import mux_deck, MASTER_FOLDER
+    from render_cache import render_cache
+    from tts_cache import audio_cache
+    from g2p_stage import phonemize_deck
+    from deck import validate_deck, valid_scenes, iter_deck, missing_model_files, deck_report
+    from hls_stream import HLSWriter, HLS_FOLDER
+
+# Kokoro's fixed output rate (kokoro_onnx.SAMPLE_RATE), kept here so the
+# model runtime is only imported when something is actually synthesized
+SAMPLE_RATE = 24000
+
+# === TTS Setup (loaded on first use) ===
+_g2p = None
+_kokoro = None
+
+def get_g2p():
+    global _g2p
+    if _g2p is None:
+        EspeakG2P = lazy_import("misaki.espeak", "misaki/espeak import").EspeakG2P
+        with timed("espeak G2P init"):
+            _g2p = EspeakG2P(language="hi")
+    return _g2p
 
-# === TTS Setup ===
-g2p = EspeakG2P(language="hi")
-kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin")
+def get_kokoro():
+    global _kokoro
+    if _kokoro is None:
+        Kokoro = lazy_import("kokoro_onnx", "kokoro_onnx import").Kokoro
+        with timed("kokoro model load"):
+            _kokoro = Kokoro("kokoro-v1.0.onnx", "voices-v1.0.bin")
+    return _kokoro
 
 OUTPUT_FOLDER = "output_scenes"
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
@@ -38,20 +68,78 @@ class {scene_name}(Scene):
         self.wait(3)
 """
 
+    video_path = f"media/videos/{filename[:-3]}/480p15/{scene_name}.mp4"
+
+    cache_key = render_cache.key(manim_script, "-ql", scene_name=scene_name)
+    if render_cache.fetch(cache_key, video_path):
+        return video_path, scene_name
+
     with open(filename, "w", encoding="utf-8") as f:
         f.write(manim_script)
 
-    subprocess.run(["manim", "-pql", filename, scene_name])
+    result = subprocess.run(["manim", "-pql", filename, scene_name])
+    if result.returncode == 0:
+        render_cache.store(cache_key, video_path)
 
-    video_path = f"media/videos/{filename[:-3]}/480p15/{scene_name}.mp4"
     return video_path, scene_name
 
 # === Generate Audio from Text ===
-def generate_audio(text, output_file):
-    phonemes, _ = g2p(text)
-    samples, sample_rate = kokoro.create(phonemes, "hf_alpha", is_phonemes=True)
-    sf.write(output_file, samples, sample_rate)
-    print(f"🔊 Audio created: {output_file} | {len(samples)/sample_rate:.2f}s")
+def generate_audio(text, output_file, voice="hf_alpha", speech=None, phonemes=None):
+    cache_key = audio_cache.key(text, voice, speed=1.0, lang="hi", sample_rate=SAMPLE_RATE)
+
+    cached = audio_cache.get(cache_key) if speech is None else None
+    if cached is not None:
+        samples, duration = cached
+        with span("tts", chars=len(text), source="cache", audio_seconds=duration):
+            sf.write(output_file, samples, SAMPLE_RATE)
+        print(f"🔊 Audio created: {output_file} | {duration:.2f}s")
+        return duration
+
+    with span("tts", chars=len(text)) as tts_span:
+        if speech is not None:
+            # Synthesized ahead of time by presynthesize_deck()
+            samples, sample_rate = speech, SAMPLE_RATE
+            tts_span.set(source="prepared")
+        else:
+            if phonemes is None:
+                with span("g2p", chars=len(text)):
+                    phonemes, _ = get_g2p()(text)
+            samples, sample_rate = get_kokoro().create(phonemes, voice, is_phonemes=True)
+            tts_span.set(source="kokoro")
+        duration = audio_cache.put(cache_key, samples, sample_rate, text)
+        sf.write(output_file, samples, sample_rate)
+        tts_span.set(audio_seconds=duration)
+    print(f"🔊 Audio created: {output_file} | {duration:.2f}s")
+    return duration
+
+# === Narration Not Yet In The TTS Cache ===
+def pending_narration(data_list, key1, key2, voice="hf_alpha"):
+    texts = {}
+    for i, item in enumerate(data_list, start=1):
+        line1 = item.get(key1, "").strip()
+        line2 = item.get(key2, "").strip()
+        if not line1 or not line2 or not item.get("include_audio", True):
+            continue
+
+        text = f"{line1} {line2}"
+        if audio_cache.duration(audio_cache.key(text, voice, speed=1.0, lang="hi", sample_rate=SAMPLE_RATE)) is None:
+            texts[i] = text
+    return texts
+
+# === Batched Narration For A Whole Deck ===
+def presynthesize_deck(phonemes, sessions, intra_op_threads=None, inter_op_threads=1, voice="hf_alpha"):
+    synthesize_batch = lazy_import("tts_batch", "kokoro_onnx import").synthesize_batch
+    with span("tts_batch", items=len(phonemes), sessions=sessions) as batch_span:
+        results, report = synthesize_batch(
+            list(phonemes.values()),
+            voice=voice,
+            is_phonemes=True,
+            sessions=sessions,
+            intra_op_threads=intra_op_threads,
+            inter_op_threads=inter_op_threads,
+        )
+        batch_span.set(audio_seconds=report["audio_seconds"])
+    return {i: samples for i, (samples, _) in zip(phonemes, results)}
 
 # === Generate Silent Audio ===
 def generate_silent_audio(output_file, duration=4.0, sample_rate=22050):
@@ -61,24 +149,40 @@ def generate_silent_audio(output_file, duration=4.0, sample_rate=22050):
 
 # === Combine Audio + Video ===
 def combine_audio_video(video_path, audio_path, output_path):
-    subprocess.run([
-        "ffmpeg", "-y",
-        "-i", video_path,
-        "-i", audio_path,
-        "-c:v", "copy",
-        "-c:a", "aac",
-        "-map", "0:v:0",
-        "-map", "1:a:0",
-        "-shortest",
-        output_path
-    ])
+    with span("mux", output=output_path) as mux_span:
+        subprocess.run([
+            "ffmpeg", "-y",
+            "-i", video_path,
+            "-i", audio_path,
+            "-c:v", "copy",
+            "-c:a", "aac",
+            "-map", "0:v:0",
+            "-map", "1:a:0",
+            "-shortest",
+            output_path
+        ])
+        mux_span.set(bytes=os.path.getsize(output_path) if os.path.exists(output_path) else 0)
 
 # === Main Function ===
-def main(json_file="questions.json", key1="Question", key2="Answer"):
+def main(json_file="questions.json", key1="Question", key2="Answer", batch=False, workers=1, single_mux=False,
+         tts_sessions=0, intra_op_threads=None, inter_op_threads=1, g2p_workers=None):
     with open(json_file, "r", encoding="utf-8") as f:
         data_list = json.load(f)
 
+    # G2P for the whole deck up front, as its own stage
+    pending = pending_narration(data_list, key1, key2)
+    with span("g2p_deck", texts=len(pending)):
+        phonemes = dict(zip(pending, phonemize_deck(list(pending.values()), language="hi", workers=g2p_workers)))
+
+    prepared_speech = {}
+    if tts_sessions and phonemes:
+        prepared_speech = presynthesize_deck(phonemes, tts_sessions, intra_op_threads, inter_op_threads)
+
     final_videos = []
+    jobs = []
+    scenes = []
+    written = []
+    started = time.perf_counter()
 
     for i, item in enumerate(data_list, start=1):
         line1 = item.get(key1, "").strip()
@@ -88,34 +192,167 @@ def main(json_file="questions.json", key1="Question", key2="Answer"):
         if not line1 or not line2:
             continue
 
-        print(f"🎬 Scene {i}: {line1} → {line2} | Audio: {include_audio}")
-        raw_video_path, scene_name = scene_generator(line1, line2, classname=i)
+        with span("scene", index=i, audio=include_audio):
+            print(f"🎬 Scene {i}: {line1} → {line2} | Audio: {include_audio}")
+            if workers > 1:
+                # Rendered after the loop by the process pool
+                raw_video_path = None
+            elif batch:
+                # Render in this process instead of spawning `manim` per scene
+                render_scene = lazy_import("batch_render", "manim import").render_scene
+                with span("render", mode="batch"):
+                    raw_video_path, scene_name = render_scene(line1, line2, classname=i, template="text")
+            else:
+                with span("render", mode="subprocess"):
+                    raw_video_path, scene_name = scene_generator(line1, line2, classname=i)
 
-        output_video = os.path.join(OUTPUT_FOLDER, f"scene_{i}.mp4")
-        audio_file = os.path.join(OUTPUT_FOLDER, f"audio_{i}.wav")
+            output_video = os.path.join(OUTPUT_FOLDER, f"scene_{i}.mp4")
+            audio_file = os.path.join(OUTPUT_FOLDER, f"audio_{i}.wav")
 
-        if include_audio:
-            full_text = f"{line1} {line2}"
-            generate_audio(full_text, audio_file)
-        else:
-            generate_silent_audio(audio_file, duration=4.0)  # 4 sec silence
+            if include_audio:
+                full_text = f"{line1} {line2}"
+                generate_audio(full_text, audio_file, speech=prepared_speech.pop(i, None), phonemes=phonemes.get(i))
+            else:
+                generate_silent_audio(audio_file, duration=4.0)  # 4 sec silence
+            written.append(audio_file)
+
+            if raw_video_path is None:
+                jobs.append({
+                    "index": i,
+                    "line1": line1,
+                    "line2": line2,
+                    "template": "text",
+                    "audio_file": audio_file,
+                    "output_video": output_video,
+                })
+                continue
+
+            written.append(raw_video_path)
+            if single_mux:
+                scenes.append((raw_video_path, audio_file))
+                continue
+
+            combine_audio_video(raw_video_path, audio_file, output_video)
+            final_videos.append(output_video)
+
+    if jobs:
+        print(f"🧵 Rendering {len(jobs)} scenes with {workers} workers")
+        render_parallel = lazy_import("render_pool", "manim import").render_parallel
+        with span("render", mode="pool", scenes=len(jobs), workers=workers):
+            raw_video_paths = render_parallel(jobs, workers)
+        written.extend(raw_video_paths)
+        for job, raw_video_path in zip(jobs, raw_video_paths):
+            if single_mux:
+                scenes.append((raw_video_path, job["audio_file"]))
+                continue
+            combine_audio_video(raw_video_path, job["audio_file"], job["output_video"])
+            final_videos.append(job["output_video"])
 
-        combine_audio_video(raw_video_path, audio_file, output_video)
-        final_videos.append(output_video)
+    if single_mux:
+        # One master audio track, one concat + AAC encode for the whole deck
+        with span("mux_deck", scenes=len(scenes)):
+            mux_deck(scenes, "merged_output.mp4")
+        return deck_report(len(scenes), started, written + [os.path.join(MASTER_FOLDER, "master_audio.wav"), "merged_output.mp4"])
 
     # === Merge All Final Videos ===
     with open("merge_list.txt", "w", encoding="utf-8") as f:
         for v in final_videos:
             f.write(f"file '{os.path.abspath(v)}'\n")
 
-    subprocess.run([
-        "ffmpeg", "-y",
-        "-f", "concat", "-safe", "0",
-        "-i", "merge_list.txt",
-        "-c", "copy", "merged_output.mp4"
-    ])
+    with span("concat", videos=len(final_videos)) as concat_span:
+        subprocess.run([
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0",
+            "-i", "merge_list.txt",
+            "-c", "copy", "merged_output.mp4"
+        ])
+        concat_span.set(bytes=os.path.getsize("merged_output.mp4") if os.path.exists("merged_output.mp4") else 0)
 
     print("✅ Final video created: merged_output.mp4")
+    return deck_report(len(final_videos), started, written + final_videos + ["merged_output.mp4"])
+
+# === Streaming Runner: Scenes Go Live One By One In An HLS Playlist ===
+def main_streaming(deck_file="questions.json", key1="Question", key2="Answer", hls_dir=HLS_FOLDER):
+    # The deck is read item by item (JSON array or JSONL); G2P happens per scene
+    # since there is no whole deck to phonemize up front
+    with HLSWriter(hls_dir) as hls:
+        # Same per-item checks as --check; a malformed item is skipped, not fatal
+        for i, line1, line2, include_audio in valid_scenes(iter_deck(deck_file), key1, key2):
+            with span("scene", index=i, audio=include_audio):
+                print(f"🎬 Scene {i}: {line1} → {line2} | Audio: {include_audio}")
+                with span("render", mode="subprocess"):
+                    raw_video_path, _ = scene_generator(line1, line2, classname=i)
+
+                output_video = os.path.join(OUTPUT_FOLDER, f"scene_{i}.mp4")
+                audio_file = os.path.join(OUTPUT_FOLDER, f"audio_{i}.wav")
+                if include_audio:
+                    generate_audio(f"{line1} {line2}", audio_file)
+                else:
+                    generate_silent_audio(audio_file, duration=4.0)
+
+                combine_audio_video(raw_video_path, audio_file, output_video)
+                with span("segment", scene=i):
+                    hls.append(output_video)
+
+# === Dry Check: Validate Input, Print Planned Work ===
+def check_deck(json_file="questions.json", key1="Question", key2="Answer", voice="hf_alpha"):
+    try:
+        with open(json_file, "r", encoding="utf-8") as f:
+            data_list = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Cannot read {json_file}: {e}")
+        return False
+
+    errors, scenes = validate_deck(data_list, key1, key2)
+    narrated = [(i, f"{line1} {line2}") for i, line1, line2, include_audio in scenes if include_audio]
+    missing = missing_model_files()
+
+    cached = 0
+    if not missing:
+        cached = sum(
+            audio_cache.duration(audio_cache.key(text, voice, speed=1.0, lang="hi", sample_rate=SAMPLE_RATE)) is not None
+            for _, text in narrated
+        )
+    if missing and narrated:
+        errors.append(f"Kokoro model files missing: {', '.join(missing)}")
+
+    print(f"📋 {json_file}: {len(data_list) if isinstance(data_list, list) else 0} items, {len(scenes)} scenes")
+    print(f"   🔊 narrated: {len(narrated)} ({cached} in TTS cache, {len(narrated) - cached} to synthesize)")
+    print(f"   🤫 silent: {len(scenes) - len(narrated)}")
+    for error in errors:
+        print(f"❌ {error}")
+    print_startup_report()
+    return not errors
 
 if __name__ == "__main__":
-    main(json_file="questions.json", key1="Question", key2="Answer")
+    parser = argparse.ArgumentParser(description="Render narrated Hindi Q&A scenes with Manim and Kokoro.")
+    parser.add_argument("json_file", nargs="?", default="questions.json")
+    parser.add_argument("--batch", action="store_true", help="render all scenes in this process")
+    parser.add_argument("--workers", type=int, default=1, help="render scenes in a pool of N processes")
+    parser.add_argument("--single-mux", action="store_true", help="mux one master audio track instead of per-scene muxes")
+    parser.add_argument("--tts-sessions", type=int, default=0, help="synthesize the whole deck up front across N ONNX sessions")
+    parser.add_argument("--intra-op-threads", type=int, default=None, help="ONNX Runtime intra-op threads per TTS session")
+    parser.add_argument("--inter-op-threads", type=int, default=1, help="ONNX Runtime inter-op threads per TTS session")
+    parser.add_argument("--g2p-workers", type=int, default=None, help="processes used to phonemize the deck")
+    parser.add_argument("--no-cache", action="store_true", help="always re-render and re-synthesize, ignoring the caches")
+    parser.add_argument("--check", action="store_true", help="validate the input and print the planned work, then exit")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome/Perfetto trace of every stage to PATH")
+    parser.add_argument("--stream", action="store_true", help="read the deck incrementally (JSON array or JSONL) and publish scenes to an HLS playlist as they finish")
+    parser.add_argument("--hls-dir", default=HLS_FOLDER, help="where --stream writes playlist.m3u8 and its segments")
+    args = parser.parse_args()
+    render_cache.enabled = not args.no_cache
+    audio_cache.enabled = not args.no_cache
+    if args.trace:
+        tracer.enable()
+
+    if args.check:
+        sys.exit(0 if check_deck(json_file=args.json_file, key1="Question", key2="Answer") else 1)
+
+    if args.stream:
+        main_streaming(args.json_file, key1="Question", key2="Answer", hls_dir=args.hls_dir)
+    else:
+        main(json_file=args.json_file, key1="Question", key2="Answer", batch=args.batch, workers=args.workers, single_mux=args.single_mux,
+             tts_sessions=args.tts_sessions, intra_op_threads=args.intra_op_threads, inter_op_threads=args.inter_op_threads,
+             g2p_workers=args.g2p_workers)
+    print_startup_report()
+    tracer.finish(args.trace)
@@ -0,0 +1,294 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+from textwrap import wrap
+from startup import lazy_import
+from render_cache import render_cache
+from deck import validate_deck
+from tracing import span
+
+# Same output as `manim -ql` (480p15) and the same file layout, so a fast card
+# drops into combine_audio_video() / mux_deck() exactly where a Manim render would.
+PIXEL_WIDTH = 854
+PIXEL_HEIGHT = 480
+FRAME_RATE = 15
+SCRIPT_NAME = "main_temp.py"
+
+# Manim's defaults for the Q&A template: 8 scene units of frame height,
+# FadeIn/FadeOut run for 1s and shift=UP/DOWN moves by 1 unit
+PIXELS_PER_UNIT = PIXEL_HEIGHT / 8.0
+RUN_TIME = 1.0
+SHIFT_PIXELS = 1.0 * PIXELS_PER_UNIT
+START_SCALE = 0.9
+
+# Mean absolute difference per pixel channel (0-255), worst frame, allowed by `verify`
+TOLERANCE = 3.0
+VERIFY_FOLDER = "fast_card_verify"
+# Decks that passed `verify`, per Manim version: --fast-cards and --single-encode
+# refuse to run until the installed Manim has at least one
+VERIFIED_FILE = os.path.join(VERIFY_FOLDER, "verified.json")
+
+# === Rate Function (manim.rate_functions.smooth) ===
+def smooth(t, inflection=10.0):
+    error = 1 / (1 + np.exp(inflection / 2))
+    value = (1 / (1 + np.exp(-inflection * (t - 0.5))) - error) / (1 - 2 * error)
+    return min(max(value, 0.0), 1.0)
+
+# === Rasterize The Card Once ===
+def rasterize_card(line1, line2):
+    """Draw the card's resting frame with Manim's own text layout and Cairo camera.
+
+    Pango does the shaping, so Devanagari and other complex scripts look exactly as
+    they do in a full render. Returns the cropped RGB sprite (float32, one black
+    pixel of padding all round) and the frame position of its top-left pixel.
+    """
+    manim = lazy_import("manim", "manim import")
+    with manim.tempconfig({"pixel_width": PIXEL_WIDTH, "pixel_height": PIXEL_HEIGHT, "frame_rate": FRAME_RATE}):
+        # Same layout as the script written by demo_english.build_scene_script()
+        t1 = manim.Paragraph("\n".join(wrap(line1, width=40)), alignment='center', font_size=52).scale_to_fit_width(manim.config.frame_width * 0.9)
+        t1.set_color(manim.YELLOW)
+        t2 = manim.Paragraph("\n".join(wrap(line2, width=60)), alignment='center', font_size=64).scale_to_fit_width(manim.config.frame_width * 0.9)
+        t2.set_color(manim.GREEN)
+        group = manim.VGroup(t1, t2).arrange(manim.DOWN, buff=0.8).move_to(manim.ORIGIN)
+
+        camera = manim.Camera()
+        camera.capture_mobject(group)
+        # Default black background, so RGB is already the card composited over it
+        rgb = camera.pixel_array[:, :, :3]
+
+    rows = np.flatnonzero(rgb.any(axis=(1, 2)))
+    cols = np.flatnonzero(rgb.any(axis=(0, 2)))
+    if not len(rows):
+        return np.zeros((2, 2, 3), np.float32), (PIXEL_HEIGHT // 2, PIXEL_WIDTH // 2)
+
+    top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    sprite = np.pad(rgb[top:bottom, left:right].astype(np.float32), ((1, 1), (1, 1), (0, 0)))
+    return sprite, (top - 1, left - 1)
+
+# === Vectorized Compositing ===
+def sample_axis(image, coords, axis):
+    # Linear interpolation along one axis; coordinates past the black border stay black
+    size = image.shape[axis]
+    low = np.clip(np.floor(coords).astype(np.intp), 0, size - 2)
+    weight = np.clip(coords - low, 0.0, 1.0)
+    shape = [1] * image.ndim
+    shape[axis] = len(coords)
+    weight = weight.reshape(shape)
+    return np.take(image, low, axis=axis) * (1 - weight) + np.take(image, low + 1, axis=axis) * weight
+
+def render_frame(sprite, origin, scale=1.0, dy=0.0, opacity=1.0):
+    """One rgb24 frame: the sprite scaled about the frame centre, moved `dy` pixels down and faded."""
+    frame = np.zeros((PIXEL_HEIGHT, PIXEL_WIDTH, 3), np.uint8)
+    if opacity <= 0:
+        return frame.tobytes()
+
+    height, width = sprite.shape[:2]
+    y0, x0 = origin
+    # ORIGIN sits on the boundary between the two middle pixels
+    cy, cx = PIXEL_HEIGHT / 2 - 0.5, PIXEL_WIDTH / 2 - 0.5
+
+    top = max(0, int(np.floor((y0 - cy) * scale + cy + dy)))
+    bottom = min(PIXEL_HEIGHT, int(np.ceil((y0 + height - cy) * scale + cy + dy)) + 1)
+    left = max(0, int(np.floor((x0 - cx) * scale + cx)))
+    right = min(PIXEL_WIDTH, int(np.ceil((x0 + width - cx) * scale + cx)) + 1)
+    if top >= bottom or left >= right:
+        return frame.tobytes()
+
+    # Scaling plus translation is separable: resample rows, then columns
+    source_rows = (np.arange(top, bottom) - dy - cy) / scale + cy - y0
+    source_cols = (np.arange(left, right) - cx) / scale + cx - x0
+    region = sample_axis(sample_axis(sprite, source_rows, 0), source_cols, 1)
+    frame[top:bottom, left:right] = np.clip(region * opacity + 0.5, 0, 255).astype(np.uint8)
+    return frame.tobytes()
+
+def card_frames(sprite, origin, wait_time):
+    """Frames of FadeIn(shift=UP, scale=0.9), wait(wait_time), FadeOut(shift=DOWN).
+
+    Timed like Manim: each animation samples alpha = k / frames for k < frames,
+    and a wait repeats the resting frame, which is composited once.
+    """
+    steps = round(RUN_TIME * FRAME_RATE)
+    for k in range(steps):
+        alpha = smooth(k / steps)
+        yield render_frame(sprite, origin, START_SCALE + (1 - START_SCALE) * alpha, (1 - alpha) * SHIFT_PIXELS, alpha)
+
+    still = render_frame(sprite, origin)
+    for _ in range(round(wait_time * FRAME_RATE)):
+        yield still
+
+    for k in range(steps):
+        alpha = smooth(k / steps)
+        yield render_frame(sprite, origin, 1.0, alpha * SHIFT_PIXELS, 1 - alpha)
+
+def frame_count(wait_time):
+    return 2 * round(RUN_TIME * FRAME_RATE) + round(wait_time * FRAME_RATE)
+
+# === Encode Raw Frames Through One ffmpeg Pipe ===
+def encode_frames(frames, video_path):
+    os.makedirs(os.path.dirname(video_path) or ".", exist_ok=True)
+    # libx264 / yuv420p / crf 23, as Manim writes its movies
+    process = subprocess.Popen([
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "-s", f"{PIXEL_WIDTH}x{PIXEL_HEIGHT}", "-r", str(FRAME_RATE),
+        "-i", "-",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "23",
+        "-movflags", "+faststart",
+        video_path,
+    ], stdin=subprocess.PIPE)
+    try:
+        for frame in frames:
+            process.stdin.write(frame)
+    except BrokenPipeError:
+        pass  # ffmpeg already failed; its return code says so
+    finally:
+        process.stdin.close()
+    return process.wait()
+
+# === Render One Card Without Manim's Frame Loop ===
+def render_card(line1, line2, classname=1, wait_time=3, media_dir="media"):
+    scene_name = f"text_{classname}"
+    video_path = f"{media_dir}/videos/{SCRIPT_NAME[:-3]}/{PIXEL_HEIGHT}p{FRAME_RATE}/{scene_name}.mp4"
+
+    content = json.dumps(["fast_card", line1, line2, wait_time], ensure_ascii=False)
+    cache_key = render_cache.key(content, "-ql")
+    if render_cache.fetch(cache_key, video_path):
+        return video_path, scene_name
+
+    with span("rasterize", scene=classname):
+        sprite, origin = rasterize_card(line1, line2)
+    with span("encode", scene=classname, frames=frame_count(wait_time)) as encode_span:
+        returncode = encode_frames(card_frames(sprite, origin, wait_time), video_path)
+        encode_span.set(bytes=os.path.getsize(video_path) if os.path.exists(video_path) else 0)
+
+    if returncode == 0:
+        render_cache.store(cache_key, video_path)
+    else:
+        print(f"⚠️ ffmpeg failed on fast card {scene_name} (exit {returncode})")
+    return video_path, scene_name
+
+# === Visual Check Against Manim ===
+def decode_frames(video_path):
+    result = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", video_path, "-f", "rawvideo", "-pix_fmt", "rgb24", "-"],
+        capture_output=True, check=True,
+    )
+    return np.frombuffer(result.stdout, np.uint8).reshape(-1, PIXEL_HEIGHT, PIXEL_WIDTH, 3)
+
+def frame_difference(fast_path, manim_path):
+    """Per-frame mean absolute difference (0-255) between two renders of the same card."""
+    fast, reference = decode_frames(fast_path), decode_frames(manim_path)
+    frames = min(len(fast), len(reference))
+    diff = np.abs(fast[:frames].astype(np.int16) - reference[:frames].astype(np.int16))
+    return diff.reshape(frames, -1).mean(axis=1), len(fast), len(reference)
+
+def verify(data_list, key1="Question", key2="Answer", wait_time=3, limit=None, tolerance=TOLERANCE):
+    """Render each card with Manim and with the fast path; returns the per-scene comparison."""
+    render_scene = lazy_import("batch_render", "manim import").render_scene
+    render_cache.enabled = False
+    errors, scenes = validate_deck(data_list, key1, key2)
+    for error in errors:
+        print(f"⚠️ {error}, skipped")
+
+    results = []
+    for i, line1, line2, _ in scenes[:limit]:
+        start = time.perf_counter()
+        manim_path, _ = render_scene(line1, line2, classname=i, wait_time=wait_time, media_dir=os.path.join(VERIFY_FOLDER, "manim"))
+        manim_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast_path, _ = render_card(line1, line2, classname=i, wait_time=wait_time, media_dir=os.path.join(VERIFY_FOLDER, "fast"))
+        fast_seconds = time.perf_counter() - start
+
+        diffs, fast_frames, manim_frames = frame_difference(fast_path, manim_path)
+        result = {
+            "scene": i,
+            "ok": bool(fast_frames == manim_frames and diffs.max() <= tolerance),
+            "mean_diff": float(diffs.mean()),
+            "worst_diff": float(diffs.max()),
+            "worst_frame": int(diffs.argmax()),
+            "frames": [fast_frames, manim_frames],
+            "manim_seconds": manim_seconds,
+            "fast_seconds": fast_seconds,
+        }
+        results.append(result)
+        print(
+            f"{'✅' if result['ok'] else '❌'} Scene {i}: diff mean {result['mean_diff']:.2f} worst {result['worst_diff']:.2f} "
+            f"(frame {result['worst_frame']}), frames {fast_frames}/{manim_frames}, "
+            f"manim {manim_seconds:.2f}s, fast {fast_seconds:.2f}s ({manim_seconds / fast_seconds:.1f}x)"
+        )
+
+    if results:
+        manim_total = sum(r["manim_seconds"] for r in results)
+        fast_total = sum(r["fast_seconds"] for r in results)
+        print(f"📊 {len(results)} cards: manim {manim_total:.1f}s, fast {fast_total:.1f}s, "
+              f"{manim_total / fast_total:.1f}x faster, worst frame diff {max(r['worst_diff'] for r in results):.2f}, "
+              f"{sum(not r['ok'] for r in results)} over tolerance {tolerance}")
+    return results
+
+# === Verification Record ===
+def manim_version():
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        return version("manim")
+    except PackageNotFoundError:
+        return None
+
+def load_verified(path=VERIFIED_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def record_verified(deck, results, tolerance, path=VERIFIED_FILE):
+    verified = load_verified(path)
+    verified.setdefault(manim_version(), {})[os.path.basename(deck)] = {
+        "scenes": len(results),
+        "tolerance": tolerance,
+        "worst_diff": max(r["worst_diff"] for r in results),
+        "speedup": sum(r["manim_seconds"] for r in results) / sum(r["fast_seconds"] for r in results),
+        "verified_at": time.time(),
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.{os.getpid()}.tmp", "w", encoding="utf-8") as f:
+        json.dump(verified, f, indent=2)
+    os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+def require_verified(path=VERIFIED_FILE):
+    """Exit unless `python fast_card.py <deck>` has passed against the installed Manim."""
+    version = manim_version()
+    if version is None:
+        sys.exit("❌ Fast cards rasterize with Manim, which is not installed")
+    decks = load_verified(path).get(version)
+    if not decks:
+        sys.exit(
+            f"❌ Fast cards have not been checked against Manim {version}: run `python fast_card.py agents.json` "
+            f"and `python fast_card.py questions.json` (Devanagari) first"
+        )
+    print(f"✅ Fast cards verified against Manim {version} on {', '.join(sorted(decks))}")
+
+if __name__ == "__main__":
+    # e.g. `python fast_card.py agents.json` or `python fast_card.py questions.json --limit 3` (Devanagari)
+    parser = argparse.ArgumentParser(description="Check fast text cards against full Manim renders of the same deck.")
+    parser.add_argument("json_file", nargs="?", default="agents.json")
+    parser.add_argument("--wait", type=float, default=3, help="seconds the card rests on screen")
+    parser.add_argument("--limit", type=int, default=None, help="only check the first N scenes")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="worst-frame mean absolute difference allowed (0-255)")
+    parser.add_argument("--report", metavar="PATH", help="also write the per-scene results as JSON, e.g. to attach to a PR")
+    args = parser.parse_args()
+
+    with open(args.json_file, "r", encoding="utf-8") as f:
+        data_list = json.load(f)
+    results = verify(data_list, wait_time=args.wait, limit=args.limit, tolerance=args.tolerance)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"deck": args.json_file, "manim": manim_version(), "tolerance": args.tolerance, "scenes": results}, f, indent=2)
+    passed = bool(results) and all(r["ok"] for r in results)
+    if passed:
+        record_verified(args.json_file, results, args.tolerance)
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,84 @@
+import os
+import re
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from tracing import span
+
+# Phonemes per sentence, persisted across runs: recurring phrases are only
+# ever sent through espeak once.
+CACHE_FOLDER = ".g2p_cache"
+BATCH_SIZE = 32
+
+_g2p = None
+
+def split_sentences(text):
+    return [s for s in re.split(r"(?<=[।॥!?])\s+", " ".join(text.split())) if s]
+
+# === Persistent Sentence -> Phonemes Memo ===
+class G2PCache:
+    def __init__(self, language, cache_dir=CACHE_FOLDER):
+        self.path = os.path.join(cache_dir, f"{language}.json")
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        self.dirty = False
+
+    def __contains__(self, sentence):
+        return sentence in self.entries
+
+    def __getitem__(self, sentence):
+        return self.entries[sentence]
+
+    def update(self, phonemized):
+        self.entries.update(phonemized)
+        self.dirty = self.dirty or bool(phonemized)
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+# === Worker Side ===
+def _init_worker(language):
+    global _g2p
+    from misaki.espeak import EspeakG2P
+    _g2p = EspeakG2P(language=language)
+
+def _phonemize_batch(sentences):
+    return [_g2p(sentence)[0] for sentence in sentences]
+
+# === Phonemize A Whole Deck Up Front ===
+def phonemize_deck(texts, language="hi", workers=None, batch_size=BATCH_SIZE):
+    start = time.perf_counter()
+    cache = G2PCache(language)
+
+    sentences_per_text = [split_sentences(text) for text in texts]
+    total = sum(len(sentences) for sentences in sentences_per_text)
+    memoized = sum(sentence in cache for sentences in sentences_per_text for sentence in sentences)
+    missing = list(dict.fromkeys(
+        sentence for sentences in sentences_per_text for sentence in sentences if sentence not in cache
+    ))
+
+    if missing:
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        workers = min(workers or os.cpu_count() or 1, len(batches))
+        with span("g2p", sentences=len(missing), batches=len(batches), workers=workers), \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(language,)) as pool:
+            for batch, phonemes in zip(batches, pool.map(_phonemize_batch, batches)):
+                cache.update(dict(zip(batch, phonemes)))
+        cache.save()
+
+    phonemes = [" ".join(cache[sentence] for sentence in sentences) for sentences in sentences_per_text]
+
+    print(
+        f"🔤 G2P stage: {len(texts)} texts, {total} sentences "
+        f"({memoized} memoized, {len(missing)} unique phonemized) in {time.perf_counter() - start:.2f}s"
+    )
+    return phonemes
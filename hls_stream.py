@@ -0,0 +1,78 @@
+import os
+import math
+import time
+import subprocess
+from master_mux import mp4_duration
+
+HLS_FOLDER = "output_hls"
+PLAYLIST_NAME = "playlist.m3u8"
+# Fixed up front so the playlist never has to be rewritten; scenes are rarely this long
+TARGET_DURATION = 30
+
+# === Growing HLS Playlist ===
+# Each finished scene is stream-copied into one MPEG-TS segment, its timestamps
+# shifted to where the previous scene ended, and appended to an EVENT playlist:
+# the deck is playable while it is still rendering, and memory and per-scene
+# work stay flat however long it gets.
+class HLSWriter:
+    def __init__(self, output_dir=HLS_FOLDER, target_duration=TARGET_DURATION):
+        self.output_dir = output_dir
+        self.playlist_path = os.path.join(output_dir, PLAYLIST_NAME)
+        self.target_duration = target_duration
+        self.segments = 0
+        self.duration = 0.0
+        self.started = time.perf_counter()
+        self.first_segment_after = None
+
+    def __enter__(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.playlist_path, "w", encoding="utf-8") as f:
+            f.write(
+                "#EXTM3U\n"
+                "#EXT-X-VERSION:3\n"
+                "#EXT-X-PLAYLIST-TYPE:EVENT\n"
+                f"#EXT-X-TARGETDURATION:{self.target_duration}\n"
+                "#EXT-X-MEDIA-SEQUENCE:0\n"
+            )
+        return self
+
+    def append(self, video_path):
+        segment_name = f"segment_{self.segments:05d}.ts"
+        segment_path = os.path.join(self.output_dir, segment_name)
+        scene_duration = mp4_duration(video_path)
+
+        result = subprocess.run([
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-i", video_path,
+            "-c", "copy",
+            "-output_ts_offset", f"{self.duration:.6f}",
+            "-f", "mpegts", segment_path,
+        ])
+        if result.returncode != 0:
+            print(f"⚠️ Could not segment {video_path}, skipped")
+            return None
+
+        if math.ceil(scene_duration) > self.target_duration:
+            print(f"⚠️ {video_path} is {scene_duration:.1f}s, longer than the {self.target_duration}s target duration")
+
+        # One write per entry, so a player polling the playlist never sees half of it
+        with open(self.playlist_path, "a", encoding="utf-8") as f:
+            f.write(f"#EXTINF:{scene_duration:.3f},\n{segment_name}\n")
+            f.flush()
+
+        self.segments += 1
+        self.duration += scene_duration
+        if self.first_segment_after is None:
+            self.first_segment_after = time.perf_counter() - self.started
+            print(f"📺 First scene playable after {self.first_segment_after:.1f}s: {self.playlist_path}")
+        return segment_path
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # Left open: what was published so far stays playable
+            print(f"⚠️ Stopped after {self.segments} scenes, playlist left without an end marker")
+            return False
+        with open(self.playlist_path, "a", encoding="utf-8") as f:
+            f.write("#EXT-X-ENDLIST\n")
+        print(f"📺 HLS playlist complete: {self.segments} scenes, {self.duration:.1f}s -> {self.playlist_path}")
+        return False
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import asyncio
+import threading
+import statistics
+import subprocess
+import contextlib
+import contextvars
+
+# Enabled by `--trace out.json` on the command line or TRACE_FILE=out.json in
+# the environment. While disabled, span() hands back one shared no-op object,
+# so instrumented code costs a function call and nothing else.
+TRACE_FILE = os.environ.get("TRACE_FILE")
+
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "parent", "start", "token")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.parent = None
+        self.start = None
+        self.token = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.parent = _current.get()
+        self.token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _current.reset(self.token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer._record(self, end)
+        return False
+
+
+# === Tracer ===
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._tracks = {}
+
+    def enable(self):
+        self.enabled = True
+        self.origin = time.perf_counter()
+
+    def reset(self):
+        """Drop recorded spans, so the next run's events and timestamps start from scratch."""
+        with self._lock:
+            self.events = []
+            self._tracks = {}
+        self.origin = time.perf_counter()
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NOOP
+        return Span(self, name, attrs)
+
+    def add(self, name, start, end=None, **attrs):
+        """Record a span measured by hand, e.g. time spent waiting on an async iterator."""
+        if not self.enabled:
+            return
+        span = Span(self, name, attrs)
+        span.parent = _current.get()
+        span.start = start
+        self._record(span, end if end is not None else time.perf_counter())
+
+    def _track(self):
+        # Concurrent asyncio tasks share a thread; give each its own row in the viewer
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = ("task", id(task)) if task is not None else ("thread", threading.get_ident())
+        with self._lock:
+            return self._tracks.setdefault(key, len(self._tracks) + 1)
+
+    def _record(self, span, end):
+        event = {
+            "name": span.name,
+            "ph": "X",
+            "ts": (span.start - self.origin) * 1e6,
+            "dur": (end - span.start) * 1e6,
+            "pid": os.getpid(),
+            "tid": self._track(),
+            "args": {**span.attrs, "parent": span.parent.name if span.parent else None},
+        }
+        with self._lock:
+            self.events.append(event)
+
+    # === Export ===
+    def export(self, path):
+        # Chrome trace format: open in chrome://tracing or https://ui.perfetto.dev
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def summary(self):
+        totals = {}
+        for event in self.events:
+            count, total, longest = totals.get(event["name"], (0, 0.0, 0.0))
+            totals[event["name"]] = (count + 1, total + event["dur"], max(longest, event["dur"]))
+
+        lines = [f"{'span':<24} {'count':>6} {'total s':>10} {'mean ms':>10} {'max ms':>10}"]
+        for name, (count, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<24} {count:>6} {total / 1e6:>10.2f} {total / count / 1e3:>10.1f} {longest / 1e3:>10.1f}")
+        return "\n".join(lines)
+
+    def stage_stats(self):
+        """Count, p50/p95 and total per span name, as the benchmark reports compare them."""
+        durations = {}
+        for event in self.events:
+            durations.setdefault(event["name"], []).append(event["dur"] / 1e3)
+        return {
+            name: {"count": len(values), "p50_ms": percentile(values, 50), "p95_ms": percentile(values, 95), "total_s": sum(values) / 1e3}
+            for name, values in durations.items()
+        }
+
+    def finish(self, path=None):
+        path = path or TRACE_FILE
+        if not self.enabled or not path:
+            return
+        self.export(path)
+        print(f"🧭 Trace written to {path} ({len(self.events)} spans)")
+        print(self.summary())
+
+
+def percentile(values, q):
+    # Linear interpolation between closest ranks, the same as numpy.percentile's default
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+# === Process Counting ===
+@contextlib.contextmanager
+def count_processes():
+    """Count the subprocesses started inside the block by program name; subprocess.Popen is restored on exit."""
+    spawned = {}
+    real_popen = subprocess.Popen
+
+    class CountingPopen(real_popen):
+        # subprocess.run and asyncio's subprocess transport both construct subprocess.Popen
+        def __init__(self, args, *a, **kw):
+            program = os.path.basename(str(args[0] if isinstance(args, (list, tuple)) else args).split()[0])
+            spawned[program] = spawned.get(program, 0) + 1
+            super().__init__(args, *a, **kw)
+
+    subprocess.Popen = CountingPopen
+    try:
+        yield spawned
+    finally:
+        subprocess.Popen = real_popen
+
+
+tracer = Tracer()
+if TRACE_FILE:
+    tracer.enable()
+
+
+def span(name, **attrs):
+    return tracer.span(name, **attrs)
+
@@ -0,0 +1,107 @@
+import os
+import struct
+import subprocess
+import numpy as np
+import soundfile as sf
+
+SAMPLE_RATE = 24000
+MASTER_FOLDER = "output_scenes"
+BLOCK_FRAMES = 24000 * 10
+
+# === MP4 Duration (reads the mvhd box, no ffprobe process) ===
+def mp4_duration(path):
+    with open(path, "rb") as f:
+        return _find_mvhd(f, 0, os.path.getsize(path))
+
+def _find_mvhd(f, start, end):
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, kind = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+
+        if kind == b"moov":
+            return _find_mvhd(f, offset + header, offset + size)
+        if kind == b"mvhd":
+            version = f.read(4)[0]
+            if version == 1:
+                f.seek(16, os.SEEK_CUR)
+                timescale, duration = struct.unpack(">IQ", f.read(12))
+            else:
+                f.seek(8, os.SEEK_CUR)
+                timescale, duration = struct.unpack(">II", f.read(8))
+            return duration / timescale
+        offset += size
+    raise ValueError(f"No mvhd box in {f.name}")
+
+# === Load Scene Audio At The Master Rate ===
+def load_audio(source, sample_rate=SAMPLE_RATE):
+    # A path to a per-scene WAV, or float32 samples (e.g. a TTS cache hit)
+    if isinstance(source, str):
+        samples, source_rate = sf.read(source, dtype="float32")
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+    else:
+        samples, source_rate = source, sample_rate
+
+    if source_rate != sample_rate:
+        # Silence in demo_hindi is written at 22050 Hz next to 24 kHz speech
+        positions = np.arange(int(len(samples) * sample_rate / source_rate)) * (source_rate / sample_rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+    return samples
+
+# === Build The Master Audio Timeline ===
+def build_master_audio(scenes, output_path, sample_rate=SAMPLE_RATE):
+    # Each scene's audio starts exactly where its video starts: durations are
+    # rounded to whole samples once, so no drift accumulates across the deck.
+    durations = [mp4_duration(video_path) for video_path, _ in scenes]
+    offsets = np.concatenate([[0], np.cumsum(np.round(np.array(durations) * sample_rate))]).astype(np.int64)
+    total = int(offsets[-1])
+
+    timeline_path = f"{output_path}.f32"
+    timeline = np.memmap(timeline_path, dtype=np.float32, mode="w+", shape=(max(total, 1),))
+    timeline[:] = 0.0
+
+    for (_, audio_source), start, end in zip(scenes, offsets[:-1], offsets[1:]):
+        samples = load_audio(audio_source, sample_rate)[:end - start]
+        timeline[start:start + len(samples)] = samples
+
+    with sf.SoundFile(output_path, "w", samplerate=sample_rate, channels=1) as f:
+        for start in range(0, total, BLOCK_FRAMES):
+            f.write(np.asarray(timeline[start:start + BLOCK_FRAMES]))
+
+    del timeline
+    os.remove(timeline_path)
+    print(f"🎚️ Master audio written: {output_path} ({total / sample_rate:.2f}s, {len(scenes)} scenes)")
+    return total / sample_rate
+
+# === Concat Videos + Mux Master Audio In One ffmpeg Call ===
+def mux_deck(scenes, output_path="merged_output.mp4", sample_rate=SAMPLE_RATE):
+    os.makedirs(MASTER_FOLDER, exist_ok=True)
+    master_audio = os.path.join(MASTER_FOLDER, "master_audio.wav")
+    build_master_audio(scenes, master_audio, sample_rate)
+
+    list_path = os.path.join(MASTER_FOLDER, "video_list.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for video_path, _ in scenes:
+            f.write(f"file '{os.path.abspath(video_path)}'\n")
+
+    # Video is stream-copied; the whole narration goes through one AAC encode
+    subprocess.run([
+        "ffmpeg", "-y",
+        "-f", "concat", "-safe", "0", "-i", list_path,
+        "-i", master_audio,
+        "-map", "0:v:0",
+        "-map", "1:a:0",
+        "-c:v", "copy",
+        "-c:a", "aac",
+        "-shortest",
+        output_path
+    ])
+
+    print(f"✅ Final video created: {output_path}")
@@ -0,0 +1,141 @@
+import os
+import sys
+import shutil
+import hashlib
+import importlib.metadata
+
+# Rendered scene videos keyed by what they were rendered from, so re-running
+# a deck only renders the entries that actually changed.
+CACHE_FOLDER = ".render_cache"
+MAX_CACHE_BYTES = 2 * 1024 ** 3  # 2 GB
+
+def manim_version():
+    try:
+        return importlib.metadata.version("manim")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+# === Content-Addressed Scene Video Cache ===
+class RenderCache:
+    def __init__(self, cache_dir=CACHE_FOLDER, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = True
+
+    def key(self, content, flags, scene_name=None):
+        if scene_name:
+            # The class name only picks the output file name, not what is drawn
+            content = content.replace(f"class {scene_name}(", "class _(")
+
+        digest = hashlib.sha256()
+        for part in (manim_version(), flags, content):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp4")
+
+    def _record(self, event):
+        # Single short appends, so concurrent pool workers don't clobber each other
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, "events.log"), "a") as f:
+            f.write(f"{event}\n")
+
+    def fetch(self, key, video_path):
+        if not self.enabled:
+            return False
+
+        entry = self._entry(key)
+        if not os.path.exists(entry):
+            self._record("miss")
+            return False
+
+        os.makedirs(os.path.dirname(video_path) or ".", exist_ok=True)
+        try:
+            shutil.copyfile(entry, video_path)
+        except FileNotFoundError:
+            # Evicted by another worker's store() since the check above
+            self._record("miss")
+            return False
+        try:
+            os.utime(entry)  # mtime is the LRU clock
+        except FileNotFoundError:
+            pass  # evicted right after the copy, which is still complete
+        self._record("hit")
+        print(f"♻️ Render cache hit: {video_path}")
+        return True
+
+    def store(self, key, video_path):
+        if not self.enabled or not os.path.exists(video_path):
+            return
+
+        entry = self._entry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp_path = f"{entry}.{os.getpid()}.tmp"
+        shutil.copyfile(video_path, tmp_path)
+        os.replace(tmp_path, entry)
+        self.evict()
+
+    def entries(self):
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".mp4"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue  # evicted by another worker since the walk listed it
+                    found.append((stat.st_mtime, stat.st_size, path))
+        return found
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue  # another worker evicted it first
+            print(f"🗑️ Evicted from render cache: {path}")
+
+    def stats(self):
+        counts = {"hit": 0, "miss": 0}
+        log_path = os.path.join(self.cache_dir, "events.log")
+        if os.path.exists(log_path):
+            with open(log_path) as f:
+                for line in f:
+                    event = line.strip()
+                    if event in counts:
+                        counts[event] += 1
+
+        entries = self.entries()
+        return {
+            "hits": counts["hit"],
+            "misses": counts["miss"],
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+render_cache = RenderCache()
+
+if __name__ == "__main__":
+    # `python render_cache.py stats` or `python render_cache.py clear`
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+
+    if command == "clear":
+        render_cache.clear()
+        print(f"🧹 Cleared {CACHE_FOLDER}")
+    else:
+        stats = render_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups * 100 if lookups else 0.0
+        print(f"📦 Render cache: {stats['entries']} videos, {stats['bytes'] / 1024 ** 2:.1f} MB")
+        print(f"♻️ Hits: {stats['hits']} | Misses: {stats['misses']} | Hit rate: {hit_rate:.1f}%")
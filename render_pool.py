@@ -0,0 +1,38 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from batch_render import render_scene
+
+# Every job renders into its own scratch tree, so concurrent scenes never
+# share main_temp.py, media/ or partial movie files.
+WORK_FOLDER = "render_jobs"
+
+# === Render One Job (runs in a pool worker) ===
+def render_job(job):
+    work_dir = os.path.abspath(os.path.join(WORK_FOLDER, f"scene_{job['index']}"))
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+
+    video_path, _ = render_scene(
+        job["line1"],
+        job["line2"],
+        classname=job["index"],
+        wait_time=job.get("wait_time", 3),
+        template=job.get("template", "paragraph"),
+        media_dir=os.path.join(work_dir, "media"),
+    )
+    return job["index"], video_path
+
+# === Render Jobs Concurrently, Results In Input Order ===
+def render_parallel(jobs, workers=None):
+    workers = workers or os.cpu_count()
+    video_paths = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_job, job) for job in jobs]
+        for future in as_completed(futures):
+            index, video_path = future.result()
+            video_paths[index] = video_path
+            print(f"🧵 Rendered scene {index} ({len(video_paths)}/{len(jobs)})")
+
+    return [video_paths[job["index"]] for job in jobs]
@@ -0,0 +1,28 @@
+import sys
+import time
+import importlib
+from contextlib import contextmanager
+
+# Wall time spent bringing up each heavy subsystem, in first-use order
+startup_times = {}
+
+@contextmanager
+def timed(subsystem):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_times[subsystem] = startup_times.get(subsystem, 0.0) + time.perf_counter() - start
+
+# === Import On First Use ===
+def lazy_import(module_name, subsystem=None):
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with timed(subsystem or module_name):
+        return importlib.import_module(module_name)
+
+def print_startup_report():
+    print("⏱️ Startup by subsystem:")
+    for subsystem, seconds in startup_times.items():
+        print(f"   {subsystem:<24} {seconds * 1000:8.1f} ms")
+    print(f"   {'total':<24} {sum(startup_times.values()) * 1000:8.1f} ms")
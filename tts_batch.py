@@ -0,0 +1,82 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import onnxruntime as rt
+from kokoro_onnx import Kokoro
+from tracing import span
+
+MODEL_PATH = "kokoro-v1.0.onnx"
+VOICES_PATH = "voices-v1.0.bin"
+
+# espeak is not thread-safe, so text -> phonemes is serialized while the
+# ONNX inference itself (which releases the GIL) runs in parallel.
+_phonemize_lock = threading.Lock()
+
+# === Kokoro With Explicit ONNX Runtime Threading ===
+def create_kokoro(intra_op_threads=0, inter_op_threads=0, model_path=MODEL_PATH, voices_path=VOICES_PATH):
+    options = rt.SessionOptions()
+    # 0 keeps ONNX Runtime's default for that pool
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    session = rt.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+    return Kokoro.from_session(session, voices_path)
+
+# === Batch Synthesis Across Several Sessions ===
+def synthesize_batch(
+    texts,
+    voice="af_heart",
+    speed=1.0,
+    lang="en-us",
+    is_phonemes=False,
+    sessions=2,
+    intra_op_threads=None,
+    inter_op_threads=1,
+):
+    # Split the cores between sessions unless told otherwise
+    if intra_op_threads is None:
+        intra_op_threads = max(1, (os.cpu_count() or 1) // sessions)
+
+    start = time.perf_counter()
+    pool = queue.Queue()
+    for _ in range(sessions):
+        pool.put(create_kokoro(intra_op_threads, inter_op_threads))
+    load_time = time.perf_counter() - start
+
+    def synthesize(text):
+        kokoro = pool.get()
+        try:
+            with span("tts_item", chars=len(text)) as item_span:
+                if is_phonemes:
+                    phonemes = text
+                else:
+                    with _phonemize_lock, span("g2p", chars=len(text)):
+                        phonemes = kokoro.tokenizer.phonemize(text, lang)
+                samples, sample_rate = kokoro.create(phonemes, voice, speed=speed, is_phonemes=True)
+                item_span.set(audio_seconds=len(samples) / sample_rate)
+            return samples, len(samples) / sample_rate
+        finally:
+            pool.put(kokoro)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        results = list(executor.map(synthesize, texts))  # map keeps input order
+    wall = time.perf_counter() - start
+
+    audio_seconds = sum(duration for _, duration in results)
+    report = {
+        "items": len(texts),
+        "sessions": sessions,
+        "intra_op_threads": intra_op_threads,
+        "inter_op_threads": inter_op_threads,
+        "load_seconds": load_time,
+        "wall_seconds": wall,
+        "audio_seconds": audio_seconds,
+        "audio_per_wall_second": audio_seconds / wall if wall else 0.0,
+    }
+    print(
+        f"🗣️ Synthesized {len(texts)} texts ({audio_seconds:.1f}s audio) in {wall:.1f}s "
+        f"with {sessions}x{intra_op_threads} threads: {report['audio_per_wall_second']:.2f} audio s / wall s"
+    )
+    return results, report
@@ -0,0 +1,153 @@
+import os
+import json
+import hashlib
+import unicodedata
+import numpy as np
+
+# Synthesized narration keyed by everything that changes the waveform, so
+# recurring intro/outro lines are only ever run through Kokoro once.
+CACHE_FOLDER = ".tts_cache"
+MODEL_FILES = ("kokoro-v1.0.onnx", "voices-v1.0.bin")
+
+_fingerprints = {}
+
+def normalize_text(text):
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+# === Model Fingerprint ===
+def model_fingerprint(paths=MODEL_FILES):
+    # Size, mtime and the first MB are enough to notice a swapped model file
+    # without hashing 300 MB on every start
+    if paths in _fingerprints:
+        return _fingerprints[paths]
+
+    digest = hashlib.sha256()
+    missing = False
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            with open(path, "rb") as f:
+                head = f.read(1024 * 1024)
+        except FileNotFoundError:
+            # Part of the key rather than an error: nothing synthesized without
+            # the model can collide with what the real model produces
+            digest.update(f"{os.path.basename(path)}:missing".encode())
+            missing = True
+            continue
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        digest.update(head)
+
+    if missing:
+        return digest.hexdigest()  # not remembered, the files may still be downloaded
+    _fingerprints[paths] = digest.hexdigest()
+    return _fingerprints[paths]
+
+# === On-Disk Audio Cache ===
+class AudioCache:
+    def __init__(self, cache_dir=CACHE_FOLDER, model_files=MODEL_FILES):
+        self.cache_dir = cache_dir
+        self.model_files = model_files
+        self.enabled = True
+
+    def key(self, text, voice, speed=1.0, lang="en-us", sample_rate=24000):
+        payload = json.dumps({
+            "text": normalize_text(text),
+            "voice": voice,
+            "speed": float(speed),
+            "lang": lang,
+            "sample_rate": int(sample_rate),
+            # Never looked up while disabled, so don't touch the model files
+            "model": model_fingerprint(self.model_files) if self.enabled else None,
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return f"{base}.f32", f"{base}.json"
+
+    def duration(self, key):
+        if not self.enabled:
+            return None
+
+        _, meta_path = self._paths(key)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)["duration"]
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        audio_path, meta_path = self._paths(key)
+        if not (os.path.exists(audio_path) and os.path.exists(meta_path)):
+            return None
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        # Memory-mapped, so long narration is paged in only as it is copied out;
+        # np.memmap refuses empty files, and an empty narration is still a hit
+        if os.path.getsize(audio_path) == 0:
+            samples = np.zeros(0, dtype=np.float32)
+        else:
+            samples = np.memmap(audio_path, dtype=np.float32, mode="r")
+        print(f"♻️ TTS cache hit: {meta['text'][:40]} ({meta['duration']:.2f}s)")
+        return samples, meta["duration"]
+
+    def writer(self, key, sample_rate, text=""):
+        return AudioCacheWriter(self, key, sample_rate, text)
+
+    def put(self, key, samples, sample_rate, text=""):
+        with self.writer(key, sample_rate, text) as writer:
+            writer.write(samples)
+        return writer.duration
+
+# === Incremental Cache Entry Writer ===
+class AudioCacheWriter:
+    # Raw float32 appended chunk by chunk, so caching never needs the whole
+    # narration in memory; the metadata written on close is what makes it a hit
+    def __init__(self, cache, key, sample_rate, text=""):
+        self.cache = cache
+        self.sample_rate = int(sample_rate)
+        self.text = text
+        self.frames = 0
+        self.audio_path, self.meta_path = cache._paths(key)
+        self.tmp_path = f"{self.audio_path}.{os.getpid()}.tmp"
+        self.file = None
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    def __enter__(self):
+        if self.cache.enabled:
+            os.makedirs(os.path.dirname(self.audio_path), exist_ok=True)
+            self.file = open(self.tmp_path, "wb")
+        return self
+
+    def write(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        self.frames += len(samples)
+        if self.file is not None:
+            self.file.write(samples.tobytes())
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.file is None:
+            return False
+
+        self.file.close()
+        if exc_type is not None:
+            os.remove(self.tmp_path)
+            return False
+
+        os.replace(self.tmp_path, self.audio_path)
+        with open(f"{self.meta_path}.{os.getpid()}.tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "text": normalize_text(self.text),
+                "sample_rate": self.sample_rate,
+                "duration": self.duration,
+            }, f, ensure_ascii=False)
+        os.replace(f"{self.meta_path}.{os.getpid()}.tmp", self.meta_path)
+        return False
+
+audio_cache = AudioCache()